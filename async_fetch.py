@@ -0,0 +1,69 @@
+import asyncio
+import random
+import time
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter: allows bursts of up to `capacity` calls, then `rate` calls per second.
+    Callers only wait when the bucket is empty, instead of sleeping a fixed time after every call.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def is_rate_limited(error):
+    """Check whether an exception is Yahoo telling us to slow down (HTTP 429)."""
+    return type(error).__name__ == "YFRateLimitError" or "429" in str(error) or "Too Many Requests" in str(error)
+
+
+async def fetch_all(symbols, fetch, on_result, rate=2.0, burst=5, max_concurrency=4, retries=3, backoff=1.0):
+    """
+    Runs a blocking per-symbol fetch for many symbols concurrently, paced by a token bucket.
+
+    Requests answered with a 429 are retried with exponential backoff (plus jitter); other errors
+    are reported right away. Results are passed to `on_result` as soon as each symbol finishes.
+
+    Args:
+        symbols (list): The symbols to fetch.
+        fetch (callable): Blocking function taking a symbol, run in a worker thread.
+        on_result (callable): Called as on_result(symbol, value); value is "Error: ..." on failure.
+        rate (float): Sustained requests per second.
+        burst (int): Requests allowed back-to-back before pacing starts.
+        max_concurrency (int): Requests in flight at the same time.
+        retries (int): Retries after a 429 response.
+        backoff (float): First retry delay in seconds, doubled on every retry.
+    """
+    bucket = TokenBucket(rate, burst)
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def fetch_one(symbol):
+        for attempt in range(retries + 1):
+            await bucket.acquire()
+            async with semaphore:
+                try:
+                    return symbol, await asyncio.to_thread(fetch, symbol)
+                except Exception as e:
+                    if not is_rate_limited(e) or attempt == retries:
+                        return symbol, f"Error: {str(e)}"
+            await asyncio.sleep(backoff * 2 ** attempt * (1 + random.random()))
+
+    for finished in asyncio.as_completed([fetch_one(symbol) for symbol in symbols]):
+        symbol, value = await finished
+        on_result(symbol, value)
@@ -0,0 +1,263 @@
+import os
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import yfinance as yf
+
+# Root directory of the on-disk bar store
+CACHE_DIR = "cache/bars"
+
+
+def _store_paths(ticker, interval, auto_adjust, prepost):
+    """
+    Builds the parquet and metadata paths for one (ticker, interval, adjustment) store.
+
+    Args:
+        ticker (str): The ticker symbol (e.g., "^IXIC", "SOUN").
+        interval (str): The bar interval (e.g., "1d", "1h", "1m").
+        auto_adjust (bool): Whether the bars are split/dividend adjusted.
+        prepost (bool): Whether the bars include pre/post market sessions.
+
+    Returns:
+        tuple: (parquet path, metadata path)
+    """
+    safe_ticker = ticker.upper().replace("^", "_").replace("/", "_")
+    mode = "adj" if auto_adjust else "raw"
+    if prepost:
+        mode += "_prepost"
+    base = os.path.join(CACHE_DIR, f"{safe_ticker}_{interval}_{mode}")
+    return base + ".parquet", base + ".json"
+
+
+def _load_store(data_path, meta_path):
+    """Load the cached bars and the list of date ranges already downloaded."""
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, []
+    try:
+        data = pd.read_parquet(data_path)
+        if data.empty:
+            # Stores holding only empty windows may have recorded failed fetches: rebuild them
+            return None, []
+        with open(meta_path) as f:
+            ranges = [(date.fromisoformat(s), date.fromisoformat(e)) for s, e in json.load(f)["ranges"]]
+        return data, ranges
+    except Exception as e:
+        # A corrupt store is simply rebuilt from the network
+        print(f"Warning: ignoring unreadable bar cache {data_path}: {e}")
+        return None, []
+
+
+def _save_store(data_path, meta_path, data, ranges):
+    """Write the bars and covered ranges, replacing the old files atomically."""
+    os.makedirs(os.path.dirname(data_path), exist_ok=True)
+    data.to_parquet(data_path + ".tmp")
+    os.replace(data_path + ".tmp", data_path)
+    with open(meta_path + ".tmp", "w") as f:
+        json.dump({"ranges": [[s.isoformat(), e.isoformat()] for s, e in ranges]}, f)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def _merge_ranges(ranges):
+    """Merge overlapping or touching [start, end) date ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _missing_ranges(ranges, start, end):
+    """Return the parts of [start, end) that are not covered by `ranges`."""
+    missing = []
+    cursor = start
+    for covered_start, covered_end in _merge_ranges(ranges):
+        if covered_end <= cursor:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > cursor:
+            missing.append((cursor, covered_start))
+        cursor = max(cursor, covered_end)
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+def _index_bound(index, day):
+    """Convert a date to a Timestamp comparable with `index` (tz-aware for intraday bars)."""
+    bound = pd.Timestamp(day)
+    if getattr(index, "tz", None) is not None:
+        bound = bound.tz_localize(index.tz)
+    return bound
+
+
+def _anchor_bar(cached, gap_start, gap_end):
+    """The cached bar just before a gap (else just after it), re-fetched with the gap to compare bases."""
+    if cached is None:
+        return None
+    before = cached.index[cached.index < _index_bound(cached.index, gap_start)]
+    if len(before):
+        return before[-1]
+    after = cached.index[cached.index >= _index_bound(cached.index, gap_end)]
+    return after[0] if len(after) else None
+
+
+def _basis_changed(cached, fresh):
+    """
+    Whether a bar present in both frames has a different close.
+
+    Yahoo re-adjusts the whole history after a split (and, for adjusted bars, a dividend), so
+    a cached segment and newly fetched bars can be on different bases; one shared bar shows it.
+    """
+    if cached is None:
+        return False
+    common = cached.index.intersection(fresh.index)
+    if len(common) == 0:
+        return False
+    bar = common[0]
+    return not np.isclose(cached.at[bar, "Close"], fresh.at[bar, "Close"], rtol=1e-6, equal_nan=True)
+
+
+def cached_download(ticker, start=None, end=None, interval="1d", auto_adjust=True,
+                    prepost=False, period=None, multi_level_index=True):
+    """
+    Drop-in replacement for `yf.download` for a single ticker, backed by a local bar store.
+
+    Bars are kept in one parquet file per (ticker, interval, adjustment mode) under CACHE_DIR.
+    Only the parts of [start, end) that have not been downloaded before are fetched and merged
+    into the store. Today's bars are never treated as complete, so they are re-fetched on each run.
+    Each fetch also re-reads one cached bar next to it; if that bar changed, a split or dividend
+    re-based the history and the whole cached span is fetched again instead of being merged.
+    Calls made with `period` instead of start/end always hit the network and write the result through.
+
+    Args:
+        ticker (str): The ticker symbol (e.g., "^IXIC").
+        start (str): First date in "YYYY-MM-DD" format (inclusive).
+        end (str): Last date in "YYYY-MM-DD" format (exclusive, like yf.download).
+        interval (str): The bar interval (e.g., "1d", "1h").
+        auto_adjust (bool): Adjust OHLC for splits/dividends (yf.download default).
+        prepost (bool): Include pre/post market bars.
+        period (str): yf.download period (e.g., "1d", "max") used when start is not given.
+        multi_level_index (bool): Return (Price, Ticker) MultiIndex columns like yf.download.
+
+    Returns:
+        pd.DataFrame: The bars for the requested range (empty if nothing was found).
+    """
+    data_path, meta_path = _store_paths(ticker, interval, auto_adjust, prepost)
+    cached, ranges = _load_store(data_path, meta_path)
+    today = date.today()
+
+    def fetch(**kwargs):
+        # Ticker.history is what yf.download runs per ticker, minus its shared global state,
+        # so it is safe to call from several threads at once
+        bars = yf.Ticker(ticker).history(interval=interval, auto_adjust=auto_adjust, prepost=prepost,
+                                         actions=False, **kwargs)
+        if interval[-1] not in ("m", "h") and getattr(bars.index, "tz", None) is not None:
+            # Daily and longer bars are tz-naive dates, as returned by yf.download
+            bars.index = bars.index.tz_localize(None)
+        return bars
+
+    frames = [] if cached is None else [cached]
+    changed = False  # Whether new bars or covered ranges need to be persisted
+    if start is None:
+        # Period based request: fetch it as-is and record the span it covered
+        fresh = fetch(period=period or "max")
+        if not fresh.empty:
+            if _basis_changed(cached, fresh):
+                frames, ranges = [], []
+            frames.append(fresh)
+            first_day = fresh.index.min().date()
+            last_day = min(fresh.index.max().date(), today)
+            ranges.append((first_day, last_day))
+            changed = True
+        request = None
+    else:
+        request_start = pd.Timestamp(start).date()
+        request_end = pd.Timestamp(end).date() if end is not None else today + timedelta(days=1)
+        for gap_start, gap_end in _missing_ranges(ranges, request_start, request_end):
+            anchor = _anchor_bar(cached, gap_start, gap_end)
+            fetch_start, fetch_end = gap_start, gap_end
+            if anchor is not None:
+                fetch_start = min(gap_start, anchor.date())
+                fetch_end = max(gap_end, anchor.date() + timedelta(days=1))
+            fresh = fetch(start=fetch_start.isoformat(), end=fetch_end.isoformat())
+            rebased = _basis_changed(cached, fresh)
+            if rebased:
+                # Rebuild everything cached or requested on the new basis in one fetch
+                gap_start = min([request_start] + [s for s, _ in ranges])
+                gap_end = max([request_end] + [e for _, e in ranges])
+                fresh = fetch(start=gap_start.isoformat(), end=gap_end.isoformat())
+                if fresh.empty:
+                    # The rebuild failed: keep the store as it is and retry on the next call
+                    break
+                frames, ranges = [], []
+            # Ticker.history returns an empty frame on network errors and rate limits too, so only
+            # a fetch that answered counts. Then windows without bars of their own (weekends,
+            # holidays, before the listing) are covered as well, as long as the anchor bar came back.
+            if not fresh.empty:
+                frames.append(fresh)
+                changed = True
+                # Only completed days count as covered
+                covered_end = min(gap_end, today)
+                if gap_start < covered_end:
+                    ranges.append((gap_start, covered_end))
+            if rebased:
+                # The rebuilt span already covers the remaining gaps
+                break
+        request = (request_start, request_end)
+
+    if not frames:
+        return pd.DataFrame()
+
+    data = frames[0]
+    if changed:
+        # New bars or covered ranges: merge them in and persist the store
+        data = pd.concat(frames)
+        data = data[~data.index.duplicated(keep="last")].sort_index()
+        _save_store(data_path, meta_path, data, _merge_ranges(ranges))
+
+    if request is None:
+        result = fresh if not fresh.empty else data.iloc[0:0]
+    else:
+        mask = (data.index >= _index_bound(data.index, request[0])) & (data.index < _index_bound(data.index, request[1]))
+        result = data[mask]
+
+    result = result.copy()
+    if multi_level_index:
+        result.columns = pd.MultiIndex.from_product([result.columns, [ticker]], names=["Price", "Ticker"])
+    return result
+
+
+def fetch_many(tickers, max_workers=8, **kwargs):
+    """
+    Downloads several tickers concurrently through the bar store.
+
+    Results are yielded as each ticker finishes, so callers can start working on the
+    first ones while the slower downloads are still in flight.
+
+    Args:
+        tickers (list): The ticker symbols to fetch (duplicates are fetched once).
+        max_workers (int): Number of downloads running at the same time.
+        **kwargs: Passed to `cached_download` (start, end, interval, ...).
+
+    Yields:
+        tuple: (ticker, pd.DataFrame) in completion order.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(cached_download, ticker, **kwargs): ticker
+            for ticker in dict.fromkeys(tickers)
+        }
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"Error fetching {ticker}: {e}")
+                data = pd.DataFrame()
+            yield ticker, data
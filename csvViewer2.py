@@ -3,12 +3,43 @@ import pandas as pd
 import yfinance as yf
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QVBoxLayout, QWidget, QLabel,
-    QLineEdit, QCalendarWidget, QSlider, QPushButton, QTableView, QFileDialog, QMessageBox, QHeaderView, QHBoxLayout, QGraphicsOpacityEffect
+    QLineEdit, QCalendarWidget, QSlider, QPushButton, QTableView, QFileDialog, QMessageBox, QHeaderView, QHBoxLayout, QGraphicsOpacityEffect, QCheckBox
 )
-from PyQt5.QtCore import Qt, QDate, QPropertyAnimation, QEasingCurve, QTimer
-from PyQt5.QtGui import QStandardItemModel, QStandardItem, QTextCharFormat, QBrush, QColor, QFont, QIntValidator, QDoubleValidator
-import random
+from PyQt5.QtCore import Qt, QDate, QPropertyAnimation, QEasingCurve, QTimer, QThreadPool
+from PyQt5.QtGui import QTextCharFormat, QBrush, QColor, QFont, QIntValidator, QDoubleValidator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from yahooquery import Ticker
+from option_chain_cache import OptionChainCache, expiration_dates, chain_slice
+from fetch_workers import FetchWorker
+from option_returns import ChainReturns, build_profit_grid
+from dataframe_model import DataFrameModel
+from monte_carlo import historical_log_returns, predict_prices, realized_volatility
+
+def fetch_ticker_data(chain_cache, stock_ticker, progress, is_cancelled):
+    """Fetch a ticker's option chain, current price and realized volatility at the same time (runs on a worker thread)."""
+    def stock_price():
+        return Ticker(stock_ticker).history(period="1d")["close"].iloc[-1]
+
+    def realized_vol():
+        # Only a fallback for contracts without an implied volatility, so not worth failing the fetch over
+        try:
+            return realized_volatility(historical_log_returns(stock_ticker))
+        except Exception:
+            return float("nan")
+
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        # Downloads the whole chain once; later date clicks slice it from the cache
+        futures = {executor.submit(chain_cache.get, stock_ticker): "expiration dates", executor.submit(stock_price): "stock price",
+                   executor.submit(realized_vol): "price history"}
+        for future in as_completed(futures):
+            future.result()
+            progress(f"Loaded {futures[future]} for {stock_ticker}...")
+    chain_future, price_future, vol_future = futures
+    return expiration_dates(chain_future.result()), price_future.result(), vol_future.result()
+
+def load_chain(chain_cache, stock_ticker, expiration_date, progress, is_cancelled):
+    """Slice one expiry out of the cached chain, re-downloading it only once it is stale (runs on a worker thread)."""
+    return chain_slice(chain_cache.get(stock_ticker), stock_ticker, expiration_date)
 
 class OptionCalculatorUI(QMainWindow):
     def __init__(self):
@@ -111,10 +142,21 @@ class OptionCalculatorUI(QMainWindow):
         self.load_button.clicked.connect(self.fetch_options_data)
         self.layout.addWidget(self.load_button)
 
+        # Cancel button for fetches still running in the background
+        self.cancel_button = QPushButton("Cancel Fetch")
+        self.cancel_button.clicked.connect(self.cancel_fetches)
+        self.layout.addWidget(self.cancel_button)
+
+        # Progress of background fetches
+        self.status_label = QLabel("")
+        self.layout.addWidget(self.status_label)
+
         # Table to display data
         self.table_view = QTableView()
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)  # Auto resize columns
-        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)  # Auto resize rows
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)  # Fixed rows, so only visible ones are measured
+        self.table_model = DataFrameModel()  # Reused for every redisplay
+        self.table_view.setModel(self.table_model)
         self.layout.addWidget(self.table_view)
 
         # Save button
@@ -125,8 +167,23 @@ class OptionCalculatorUI(QMainWindow):
 
         # Internal state
         self.options_data = None
+        self.chain_returns = None  # Target-independent columns of the loaded chain
+        self.profit_grid = None  # Precomputed returns at every slider target, once ready
         self.stock_price = 0
+        self.realized_vol = float("nan")  # Fallback volatility of the expected value columns
         self.valid_expiration_dates = []
+        self.expiration_date = None
+
+        # Background fetches; each request gets a generation number so stale results can be dropped
+        self.thread_pool = QThreadPool()
+        self.fetch_worker = None
+        self.load_worker = None
+        self.grid_worker = None
+        self.simulation_worker = None
+        self.chain_simulation = None  # Monte Carlo statistics of the loaded chain, before commission
+        self.fetch_generation = 0
+        self.load_generation = 0
+        self.chain_cache = OptionChainCache(ttl=300)  # Full chains per ticker, refreshed after 5 minutes
 
         # Create a layout for the prediction widget
         self.predict_layout = QVBoxLayout()
@@ -149,6 +206,10 @@ class OptionCalculatorUI(QMainWindow):
         self.predict_button.clicked.connect(self.generate_predicted_price)
         self.predict_layout.addWidget(self.predict_button)
 
+        # Simulate from resampled historical returns instead of lognormal prices
+        self.bootstrap_checkbox = QCheckBox("Bootstrap from price history")
+        self.predict_layout.addWidget(self.bootstrap_checkbox)
+
         # Predicted Price Display Label
         self.predicted_price_label = QLabel("Predicted Price: 0.00$")
         self.predicted_price_label.setAlignment(Qt.AlignCenter)
@@ -165,22 +226,53 @@ class OptionCalculatorUI(QMainWindow):
         self.layout.addLayout(self.predict_layout)
 
     def generate_predicted_price(self):
-        """Generate a random price within the current price ±20%."""
+        """Simulate the price at expiration and the expected profit of every loaded contract (Monte Carlo)."""
         if not hasattr(self, "stock_price") or self.stock_price == 0:
             QMessageBox.warning(self, "Error", "Please fetch options data first to get the current stock price.")
             return
 
-        # Generate random price within ±20% of the current price
-        lower_bound = self.stock_price * 0.8
-        upper_bound = self.stock_price * 1.2
-        predicted_price = round(random.uniform(lower_bound, upper_bound), 2)
+        stock_ticker = self.ticker_input.text().strip().upper()
+        table = None
+        if self.chain_returns is not None:
+            # A copy, as the GUI thread keeps updating the profit columns of the table meanwhile
+            columns = [c for c in ["Type", "strike", "premium", "implied_vol"] if c in self.chain_returns.table.columns]
+            table = self.chain_returns.table[columns].copy()
+
+        if self.simulation_worker is not None:
+            self.simulation_worker.cancel()
+        self.simulation_worker = FetchWorker(
+            (self.load_generation, stock_ticker), predict_prices, stock_ticker, self.stock_price,
+            self.expiration_date, table, self.bootstrap_checkbox.isChecked(),
+        )
+        self.simulation_worker.signals.progress.connect(self.show_fetch_progress)
+        self.simulation_worker.signals.result.connect(self.on_prediction_ready)
+        self.simulation_worker.signals.error.connect(self.on_prediction_error)
+        self.status_label.setText(f"Simulating {stock_ticker}...")
+        self.thread_pool.start(self.simulation_worker)
+
+    def on_prediction_ready(self, tag, result):
+        # Statistics of a chain that has since been replaced are dropped
+        if self.is_stale(tag, self.load_generation) or result is None:
+            return
+        (low, median, high), simulation = result
 
         # Update the predicted price label
-        self.predicted_price_label.setText(f"Predicted Price: ${predicted_price:.2f}")
+        self.predicted_price_label.setText(f"Predicted Price: ${median:.2f} (90%: ${low:.2f} - ${high:.2f})")
 
         # Add a flashy effect (e.g., fade-in animation)
         self.animate_predicted_price()
 
+        # Expected profit, probability of profit and profit percentiles stay until the next simulation
+        if simulation is not None and self.chain_returns is not None:
+            self.chain_simulation = simulation
+            self.calculate_returns()
+
+    def on_prediction_error(self, tag, message):
+        if self.is_stale(tag, self.load_generation):
+            return
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Error", f"Error simulating prices: {message}")
+
     # def animate_predicted_price(self):
     #     """Animate the predicted price, with each letter fading in one by one."""
 
@@ -324,7 +416,7 @@ class OptionCalculatorUI(QMainWindow):
         """Ensure table dynamically resizes with the window."""
         super().resizeEvent(event)
         self.table_view.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
-        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
     def fetch_options_data(self):
         stock_ticker = self.ticker_input.text().strip().upper()
@@ -332,47 +424,62 @@ class OptionCalculatorUI(QMainWindow):
             QMessageBox.warning(self, "Input Error", "Please enter a valid stock ticker.")
             return
 
-        try:
-            stock = Ticker(stock_ticker)
-            # print(stock)
-            options = stock.option_chain
-            option_table = options.index.format()
-            i=0
-            date_table = []
-            if not option_table:
-                print("No options data available for this stock.")
-            else:
-                # print("\nAvailable Expiration Dates:")
-                for date in (option_table):
-                    trim = date.strip(stock_ticker).strip().strip('calls').strip('puts').strip()
-                    if trim != '':
-                        date_table.append(trim)
-                        print(f"{i}. {trim}")
-                        i += 1
-                # print(date_table)
-            # self.valid_expiration_dates = stock.options
-            self.valid_expiration_dates = [
-                pd.to_datetime(date).strftime("%Y-%m-%d") for date in date_table
-            ]
-
-            if not self.valid_expiration_dates:
-                QMessageBox.warning(self, "Data Error", "No options data available for this stock.")
-                return
-
-            # Restrict calendar selection to valid expiration dates
-            self.restrict_calendar_to_valid_dates()
-            QMessageBox.information(
-                self, "Data Loaded", f"Available expiration dates loaded for {stock_ticker}."
-            )
-
-            # Automatically fetch the current stock price
-            self.stock_price = stock.history(period="1d")["Close"].iloc[-1]
-            QMessageBox.information(self, "Stock Price", f"Current stock price: ${self.stock_price:.2f}")
-            self.target_price_label.setText(f"Target Price: ${self.stock_price:.2f}")
-            self.slider_target_price.setValue(int(self.stock_price))
+        # Start a new request; results of any older one still in flight are dropped
+        self.fetch_generation += 1
+        if self.fetch_worker is not None:
+            self.fetch_worker.cancel()
+        self.fetch_worker = FetchWorker((self.fetch_generation, stock_ticker), fetch_ticker_data, self.chain_cache, stock_ticker)
+        self.fetch_worker.signals.progress.connect(self.show_fetch_progress)
+        self.fetch_worker.signals.result.connect(self.on_options_data_fetched)
+        self.fetch_worker.signals.error.connect(self.on_fetch_error)
+        self.status_label.setText(f"Fetching {stock_ticker}...")
+        self.thread_pool.start(self.fetch_worker)
+
+    def on_options_data_fetched(self, tag, result):
+        if self.is_stale(tag, self.fetch_generation):
+            return
+        stock_ticker = tag[1]
+        self.valid_expiration_dates, stock_price, self.realized_vol = result
+        self.status_label.setText(f"Loaded {stock_ticker}.")
 
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to fetch data for {stock_ticker}: {e}")
+        if not self.valid_expiration_dates:
+            QMessageBox.warning(self, "Data Error", "No options data available for this stock.")
+            return
+
+        # Restrict calendar selection to valid expiration dates
+        self.restrict_calendar_to_valid_dates()
+        QMessageBox.information(
+            self, "Data Loaded", f"Available expiration dates loaded for {stock_ticker}."
+        )
+
+        # Current stock price, fetched alongside the expiration dates
+        self.stock_price = stock_price
+        QMessageBox.information(self, "Stock Price", f"Current stock price: ${self.stock_price:.2f}")
+        self.target_price_label.setText(f"Target Price: ${self.stock_price:.2f}")
+        self.slider_target_price.setValue(int(self.stock_price))
+
+    def on_fetch_error(self, tag, message):
+        if self.is_stale(tag, self.fetch_generation):
+            return
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Error", f"Failed to fetch data for {tag[1]}: {message}")
+
+    def show_fetch_progress(self, tag, message):
+        self.status_label.setText(message)
+
+    def is_stale(self, tag, generation):
+        """Check whether a worker answers an outdated request or a ticker that is no longer entered."""
+        request_generation, stock_ticker = tag
+        return request_generation != generation or stock_ticker != self.ticker_input.text().strip().upper()
+
+    def cancel_fetches(self):
+        """Cancel running fetches; their results are ignored when they arrive."""
+        for worker in (self.fetch_worker, self.load_worker, self.grid_worker):
+            if worker is not None:
+                worker.cancel()
+        self.fetch_generation += 1
+        self.load_generation += 1
+        self.status_label.setText("Fetch cancelled.")
 
     def restrict_calendar_to_valid_dates(self):
         """Highlight valid expiration dates on the calendar."""
@@ -409,24 +516,56 @@ class OptionCalculatorUI(QMainWindow):
             return
 
         stock_ticker = self.ticker_input.text().strip().upper()
+        self.load_generation += 1
+        if self.load_worker is not None:
+            self.load_worker.cancel()
+        self.load_worker = FetchWorker((self.load_generation, stock_ticker), load_chain, self.chain_cache, stock_ticker, self.expiration_date)
+        self.load_worker.signals.progress.connect(self.show_fetch_progress)
+        self.load_worker.signals.result.connect(self.on_options_data_loaded)
+        self.load_worker.signals.error.connect(self.on_load_error)
+        self.status_label.setText(f"Loading {stock_ticker} {self.expiration_date} options...")
+        self.thread_pool.start(self.load_worker)
+
+    def on_options_data_loaded(self, tag, options_data):
+        if self.is_stale(tag, self.load_generation):
+            return
+        self.status_label.setText(f"Loaded {tag[1]} options.")
+        self.options_data = options_data
+        self.chain_returns = None
+        self.profit_grid = None
+        self.chain_simulation = None
+
+        # Display the initial data
+        self.display_data(self.options_data)
+        self.start_profit_grid(tag)
+
+    def start_profit_grid(self, tag):
+        """Precompute the returns of every contract at every slider target price in the background."""
+        if self.grid_worker is not None:
+            self.grid_worker.cancel()
         try:
-            # stock = yf.Ticker(stock_ticker)
-            stock = Ticker(stock_ticker)
-            # print(stock)
-            options_chain = stock.option_chain.loc[stock_ticker,self.expiration_date]
-
-            # Combine calls and puts
-            # calls = options_chain.calls
-            # puts = options_chain.puts
-            # calls["Type"] = "Call"
-            # puts["Type"] = "Put"
-            # self.options_data = pd.concat([calls, puts])
-            self.options_data = options_chain
-
-            # Display the initial data
-            self.display_data(self.options_data)
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Error loading options data: {e}")
+            self.chain_returns = ChainReturns(self.options_data, self.stock_price, self.expiration_date, self.realized_vol)
+        except Exception:
+            # Left to calculate_returns, which reports chains it cannot price
+            return
+        self.grid_worker = FetchWorker(
+            tag, build_profit_grid, self.chain_returns,
+            self.slider_target_price.minimum(), self.slider_target_price.maximum(), self.stock_price,
+        )
+        self.grid_worker.signals.progress.connect(self.show_fetch_progress)
+        self.grid_worker.signals.result.connect(self.on_profit_grid_ready)
+        self.thread_pool.start(self.grid_worker)
+
+    def on_profit_grid_ready(self, tag, profit_grid):
+        if self.is_stale(tag, self.load_generation) or profit_grid is None:
+            return
+        self.profit_grid = profit_grid
+
+    def on_load_error(self, tag, message):
+        if self.is_stale(tag, self.load_generation):
+            return
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Error", f"Error loading options data: {message}")
 
     def update_target_price_label(self):
         target_price = self.slider_target_price.value()
@@ -446,38 +585,19 @@ class OptionCalculatorUI(QMainWindow):
         target_price = self.slider_target_price.value()  # Target price from the slider
         commission = self.slider_commission.value()/100 # Commission price from slider
         try:
-            # Separate calls and puts
-            calls_data = self.options_data[self.options_data["Type"] == "Call"].copy()
-            puts_data = self.options_data[self.options_data["Type"] == "Put"].copy()
-
-            # Calculate mid-price (average of bid and ask) for both calls and puts
-            calls_data["premium"] = ((calls_data["bid"] + calls_data["ask"]) / 2).round(2)
-            puts_data["premium"] = ((puts_data["bid"] + puts_data["ask"]) / 2).round(2)
-
-            # Calculate break-even prices
-            calls_data["break_even"] = (calls_data["strike"] + calls_data["premium"]).round(2)
-            puts_data["break_even"] = (puts_data["strike"] - puts_data["premium"]).round(2)
-
-            # Calculate returns for calls
-            calls_data["option_profit"] = (
-                ((target_price - calls_data["strike"]).clip(lower=0) * 100 - (calls_data["premium"] * 100 + commission)).round(2)
-            )
-            calls_data["option_percent_profit"] = (
-                (calls_data["option_profit"] / (calls_data["premium"] * 100 + commission) * 100).round(2)
-            )
-            calls_data.loc[calls_data["break_even"] > target_price, ["option_profit", "option_percent_profit"]] = None
-
-            # Calculate returns for puts
-            puts_data["option_profit"] = (
-                ((puts_data["strike"] - target_price).clip(lower=0) * 100 - (puts_data["premium"] * 100 + commission)).round(2)
-            )
-            puts_data["option_percent_profit"] = (
-                (puts_data["option_profit"] / (puts_data["premium"] * 100 + commission) * 100).round(2)
-            )
-            puts_data.loc[puts_data["break_even"] < target_price, ["option_profit", "option_percent_profit"]] = None
-
-            # Combine calls and puts into a single DataFrame
-            combined_data = pd.concat([calls_data, puts_data], ignore_index=True)
+            # Premium, break-even and call/put masks only depend on the chain, so they are built
+            # once per loaded chain; a slider move only recomputes the profit columns
+            if self.chain_returns is None:
+                self.chain_returns = ChainReturns(self.options_data, self.stock_price, self.expiration_date, self.realized_vol)
+            # Once the background grid is ready, a slider position is just a row read
+            if self.profit_grid is not None and self.profit_grid.covers(target_price):
+                combined_data = self.profit_grid.evaluate(target_price, commission)
+            else:
+                combined_data = self.chain_returns.evaluate(target_price, commission)
+            # Monte Carlo statistics re-read for the current commission
+            if self.chain_simulation is not None:
+                for column, values in self.chain_simulation.statistics(commission).items():
+                    combined_data[column] = values
 
             # Display the combined data in the table
             self.display_data(combined_data)
@@ -487,15 +607,8 @@ class OptionCalculatorUI(QMainWindow):
 
 
     def display_data(self, data):
-        model = QStandardItemModel()
-        model.setHorizontalHeaderLabels(data.columns)
-
-        for row in data.itertuples(index=False):
-            items = [QStandardItem(str(item)) for item in row]
-            model.appendRow(items)
-
-        self.table_view.setModel(model)
-        self.table_view.resizeColumnsToContents()
+        # Cells are formatted lazily from the DataFrame; same-shaped data is updated in place
+        self.table_model.set_frame(data)
         self.save_button.setEnabled(True)
 
     def save_to_csv(self):
@@ -0,0 +1,56 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+class DataFrameModel(QAbstractTableModel):
+    """
+    Read-only table model serving cells straight from a DataFrame's column arrays.
+
+    Cells are only formatted when the view asks for them, so the cost of a redisplay follows the
+    number of visible rows rather than the size of the frame.
+    """
+
+    def __init__(self, data=None, parent=None):
+        super().__init__(parent)
+        self._columns = []
+        self._headers = []
+        self._rows = 0
+        if data is not None:
+            self.set_frame(data)
+
+    def set_frame(self, data):
+        """
+        Show a new DataFrame.
+
+        If it has the same columns and row count as the current one (e.g. the profit columns were
+        recomputed), the views are told the data changed in place instead of getting a new model.
+        """
+        columns = [data.iloc[:, i].to_numpy() for i in range(data.shape[1])]
+        headers = [str(column) for column in data.columns]
+        if headers == self._headers and len(data) == self._rows:
+            self._columns = columns
+            if self._rows and self._headers:
+                self.dataChanged.emit(self.index(0, 0), self.index(self._rows - 1, len(self._headers) - 1), [Qt.DisplayRole])
+        else:
+            self.beginResetModel()
+            self._columns = columns
+            self._headers = headers
+            self._rows = len(data)
+            self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return str(self._columns[index.column()][index.row()])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._headers[section]
+        return str(section + 1)
@@ -0,0 +1,107 @@
+from PyQt5.QtWidgets import QCalendarWidget
+from PyQt5.QtGui import QColor, QPainter, QPixmap, QTextCharFormat
+from PyQt5.QtCore import QDate, QRect, Qt
+
+BADGE_TOP = 5  # Vertical offset of the first symbol in a cell
+BADGE_LINE = 15  # Vertical step between symbols
+
+
+def badge_text_color(background_color):
+    """Black or white text, whichever reads better on the badge color."""
+    luminance = (0.299 * background_color.red() +
+                 0.587 * background_color.green() +
+                 0.114 * background_color.blue())
+    return QColor(0, 0, 0) if luminance > 186 else QColor(255, 255, 255)
+
+
+class Scheduler(QCalendarWidget):
+    """
+    Calendar that draws a colored badge for every symbol on its earnings date.
+
+    Each date's badges are rendered once into a pixmap and reused on every repaint until that
+    date's symbols change or the cell is resized. Dates are keyed by Julian day number and each
+    symbol's date is indexed, so placing a symbol only touches the dates it leaves and joins.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.symbols_on_dates = {}  # Julian day -> symbols on that date, in display order
+        self.date_of_symbol = {}  # symbol -> Julian day
+        self.colors = {}  # symbol -> QColor
+        self._badges = {}  # Julian day -> (cell size, pixmap of that date's badges)
+
+    def set_symbol_date(self, symbol, date, color):
+        """
+        Shows `symbol` on `date`, moving it off the date it was on before.
+
+        Args:
+            symbol (str): The ticker symbol.
+            date (QDate): Its earnings date.
+            color (QColor): Its badge color.
+
+        Returns:
+            bool: False if the symbol was already shown there in that color.
+        """
+        day = date.toJulianDay()
+        previous = self.date_of_symbol.get(symbol)
+        if previous == day and self.colors.get(symbol) == color:
+            return False
+
+        self.colors[symbol] = color
+        if previous != day:
+            if previous is not None:
+                self.symbols_on_dates[previous].remove(symbol)
+                if not self.symbols_on_dates[previous]:
+                    del self.symbols_on_dates[previous]
+                self._date_changed(previous)
+            self.symbols_on_dates.setdefault(day, []).append(symbol)
+            self.date_of_symbol[symbol] = day
+        self._date_changed(day)
+        return True
+
+    def _date_changed(self, day):
+        """Drop a date's cached badges and restyle just that cell."""
+        self._badges.pop(day, None)
+        date = QDate.fromJulianDay(day)
+        format = QTextCharFormat()
+        symbols = self.symbols_on_dates.get(day)
+        if symbols:
+            # Highlight the date with the color of its latest symbol
+            format.setForeground(Qt.white)
+            format.setBackground(self.colors[symbols[-1]])
+        self.setDateTextFormat(date, format)
+        self.updateCell(date)
+
+    def paintCell(self, painter, rect, date):
+        """Override paintCell to draw the date's cached symbol badges over the default cell"""
+        super().paintCell(painter, rect, date)
+
+        day = date.toJulianDay()
+        if day in self.symbols_on_dates:
+            painter.drawPixmap(rect.topLeft(), self._badge_pixmap(day, rect.size()))
+
+    def _badge_pixmap(self, day, size):
+        cached = self._badges.get(day)
+        if cached is not None and cached[0] == size:
+            return cached[1]
+
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(size * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setFont(self.font())
+        width, height = size.width(), size.height()
+        y_offset = BADGE_TOP
+        for symbol in self.symbols_on_dates[day]:
+            background_color = self.colors.get(symbol, QColor(0, 0, 0))  # Default black if no color found
+            # Each badge runs to the bottom of the cell; the next symbol's badge is drawn over it
+            painter.fillRect(QRect(0, y_offset - 2, width, height - y_offset + 2), background_color)
+            painter.setPen(badge_text_color(background_color))
+            painter.drawText(QRect(5, y_offset, width - 10, height - 5 - y_offset), Qt.AlignLeft, symbol)
+            y_offset += BADGE_LINE
+        painter.end()
+
+        self._badges[day] = (size, pixmap)
+        return pixmap
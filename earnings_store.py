@@ -0,0 +1,84 @@
+import os
+import sqlite3
+from contextlib import closing, contextmanager
+from datetime import date, datetime, timedelta
+
+# SQLite file shared by all the earnings calendar front ends
+DB_PATH = "cache/earnings.sqlite"
+
+# Variables per query; older SQLite builds cap them at 999
+_QUERY_CHUNK = 500
+
+
+class EarningsStore:
+    """
+    Earnings dates keyed by symbol, persisted in SQLite with the time each one was fetched.
+
+    A cached date is trusted until it has passed or it is older than `max_age`, so only those
+    symbols need to be fetched again. Failed fetches are never stored. Each call opens its own
+    connection, so a store can be used from fetch threads as well as the GUI thread.
+    """
+
+    def __init__(self, path=DB_PATH, max_age=timedelta(days=7)):
+        self.path = path
+        self.max_age = max_age
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS earnings ("
+                "symbol TEXT PRIMARY KEY, earnings_date TEXT, fetched_at TEXT NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # sqlite3's own context manager commits but does not close the connection
+        with closing(sqlite3.connect(self.path)) as conn, conn:
+            yield conn
+
+    def lookup(self, symbols):
+        """
+        Splits symbols into those with a fresh cached date and those that need fetching.
+
+        Args:
+            symbols (list): Ticker symbols.
+
+        Returns:
+            tuple: (dict of symbol -> datetime.date, or None when no date is scheduled,
+                list of symbols that are missing or stale, in input order)
+        """
+        rows = {}
+        with self._connect() as conn:
+            for start in range(0, len(symbols), _QUERY_CHUNK):
+                chunk = symbols[start:start + _QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows.update((symbol, (earnings_date, fetched_at)) for symbol, earnings_date, fetched_at in conn.execute(
+                    f"SELECT symbol, earnings_date, fetched_at FROM earnings WHERE symbol IN ({placeholders})", chunk))
+
+        now = datetime.now()
+        cached, stale = {}, []
+        for symbol in symbols:
+            if symbol in rows:
+                earnings_date, fetched_at = rows[symbol]
+                earnings_date = date.fromisoformat(earnings_date) if earnings_date else None
+                fresh = now - datetime.fromisoformat(fetched_at) < self.max_age
+                if fresh and (earnings_date is None or earnings_date >= now.date()):
+                    cached[symbol] = earnings_date
+                    continue
+            stale.append(symbol)
+        return cached, stale
+
+    def save(self, earnings_dates):
+        """
+        Stores freshly fetched earnings dates.
+
+        Args:
+            earnings_dates (dict): Symbol -> datetime.date (or datetime), or None when no date is scheduled.
+        """
+        fetched_at = datetime.now().isoformat(timespec="seconds")
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO earnings (symbol, earnings_date, fetched_at) VALUES (?, ?, ?)",
+                [(symbol, earnings_date.strftime("%Y-%m-%d") if earnings_date else None, fetched_at)
+                 for symbol, earnings_date in earnings_dates.items()],
+            )
@@ -1,21 +1,45 @@
 import sys
-from PyQt5.QtWidgets import QApplication, QMainWindow, QCalendarWidget, QVBoxLayout, QWidget, QLineEdit, QPushButton, QHBoxLayout
-from PyQt5.QtGui import QColor, QTextCharFormat
-from PyQt5.QtCore import QDate, Qt
+from PyQt5.QtWidgets import QApplication, QMainWindow, QVBoxLayout, QWidget, QLineEdit, QPushButton, QHBoxLayout
+from PyQt5.QtGui import QColor
+from PyQt5.QtCore import QDate
 # import yfinance as yf
 from datetime import date as datetime_date
 import random
-import time
 from yahooquery import Ticker
 from datetime import datetime
+from earnings_store import EarningsStore
+from earnings_scheduler import Scheduler
+
+EARNINGS_CHUNK_SIZE = 50  # Symbols per batched calendar_events request
+
+def parse_earnings_date(symbol_events):
+    """
+    Extracts the next earnings date from one symbol's calendar_events entry.
+
+    Args:
+        symbol_events (dict or str): The symbol's entry; yahooquery gives an error message string
+            for symbols it could not fetch.
+
+    Returns:
+        QDate: The earnings date, or None if none is scheduled.
+    """
+    if isinstance(symbol_events, str):
+        raise ValueError(symbol_events)
+    earnings_date_list = symbol_events.get("earnings", {}).get("earningsDate", [])
+    if not earnings_date_list:
+        return None
+    # Extract and parse date from string like '2025-07-23 16:00:S'
+    date_str = earnings_date_list[0].split()[0]  # '2025-07-23'
+    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+    return QDate(date_obj.year, date_obj.month, date_obj.day)
 
 class EarningsCalendar(QMainWindow):
     def __init__(self):
         super().__init__()
         self.tickers = []
         self.earnings_dates = {}
-        self.symbols_on_dates = {}  # Store symbols for specific dates
         self.colors = {}  # Map each ticker to a specific color
+        self.store = EarningsStore()
         self.initUI()
 
     def initUI(self):
@@ -59,30 +83,34 @@ class EarningsCalendar(QMainWindow):
     #     return earnings_dates
 
     def fetch_earnings_dates(self):
-        earnings_dates = {}
         print(self.tickers)
-        for ticker in self.tickers:
+        # Stored dates are used as-is; only missing or stale symbols go to the network
+        cached, stale = self.store.lookup(self.tickers)
+        earnings_dates = {ticker: QDate(date.year, date.month, date.day) if date else None
+                          for ticker, date in cached.items()}
+
+        # One batched request per chunk of symbols instead of one Ticker per symbol
+        fetched = {}
+        for start in range(0, len(stale), EARNINGS_CHUNK_SIZE):
+            chunk = stale[start:start + EARNINGS_CHUNK_SIZE]
             try:
-                # Create a Ticker instance and get calendar events
-                t = Ticker(ticker)
-                events = t.calendar_events
-                earnings_data = events.get(ticker, {}).get("earnings", {})
-                earnings_date_list = earnings_data.get("earningsDate", [])
-                # print(earnings_date_list)
-
-                if earnings_date_list:
-                    # Extract and parse date from string like '2025-07-23 16:00:S'
-                    date_str = earnings_date_list[0].split()[0]  # '2025-07-23'
-                    date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-                    earnings_dates[ticker] = QDate(date_obj.year, date_obj.month, date_obj.day)
-                else:
-                    earnings_dates[ticker] = None
-
+                events = Ticker(chunk, asynchronous=True).calendar_events
+                if not isinstance(events, dict):
+                    raise ValueError(events)
             except Exception as e:
-                earnings_dates[ticker] = f"Error: {str(e)}"
-
-            time.sleep(0.3)  # polite delay
-
+                for ticker in chunk:
+                    earnings_dates[ticker] = f"Error: {str(e)}"
+                continue
+
+            # Errors are reported per symbol
+            for ticker in chunk:
+                try:
+                    earnings_dates[ticker] = parse_earnings_date(events.get(ticker, {}))
+                    fetched[ticker] = earnings_dates[ticker].toPyDate() if earnings_dates[ticker] else None
+                except Exception as e:
+                    earnings_dates[ticker] = f"Error: {str(e)}"
+
+        self.store.save(fetched)
         print(earnings_dates)
 
         return earnings_dates
@@ -92,12 +120,6 @@ class EarningsCalendar(QMainWindow):
         self.tickers = [ticker.strip().upper() for ticker in user_input.split(',') if ticker.strip()]
         self.earnings_dates = self.fetch_earnings_dates()
 
-        # Preserve previously set symbols and colors
-        if not hasattr(self, 'symbols_on_dates'):
-            self.symbols_on_dates = {}
-        if not hasattr(self, 'colors'):
-            self.colors = {}
-
         for ticker in self.tickers:
             if ticker not in self.colors:
                 # Generate a random color for each ticker
@@ -112,64 +134,8 @@ class EarningsCalendar(QMainWindow):
                 date = QDate(date[0].year, date[0].month, date[0].day)  # Use first date if list
 
             if date and date.isValid():
-                # Append ticker to the list for that date
-                if date not in self.symbols_on_dates:
-                    self.symbols_on_dates[date] = []
-                if ticker not in self.symbols_on_dates[date]:
-                    self.symbols_on_dates[date].append(ticker)
-                
-                # Highlight the date with the ticker's specific color
-                self.calendar.setDateTextFormat(date, self.create_highlight_format(ticker))
-
-        # Pass updated symbols and colors to the calendar
-        self.calendar.set_symbols(self.symbols_on_dates, self.colors)
-        self.calendar.update()
-
-    def create_highlight_format(self, ticker):
-        """Create a text format for highlighting the date with specific color"""
-        format = QTextCharFormat()
-        format.setForeground(Qt.white)
-        format.setBackground(self.colors[ticker])
-        return format
-
-
-class Scheduler(QCalendarWidget):
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.symbols_on_dates = {}
-        self.colors = {}
-
-    def paintCell(self, painter, rect, date):
-        """Override paintCell to render custom text for specific dates"""
-        super().paintCell(painter, rect, date)
-        
-        if date in self.symbols_on_dates:
-            y_offset = 5  # Initial vertical offset for text placement
-            
-            for symbol in self.symbols_on_dates[date]:
-                # Get the color for the current symbol
-                background_color = self.colors.get(symbol, QColor(0, 0, 0))  # Default black if no color found
-                
-                # Draw a rectangle with the ticker's color
-                painter.fillRect(rect.adjusted(0, y_offset - 2, 0, y_offset + 12), background_color)
-                
-                # Calculate luminance to decide text color (black or white)
-                luminance = (0.299 * background_color.red() + 
-                            0.587 * background_color.green() + 
-                            0.114 * background_color.blue())
-                text_color = QColor(0, 0, 0) if luminance > 186 else QColor(255, 255, 255)
-                
-                # Set the text color
-                painter.setPen(text_color)
-                
-                # Draw the symbol
-                painter.drawText(rect.adjusted(5, y_offset, -5, -5), Qt.AlignLeft, symbol)
-                y_offset += 15  # Move to the next line for the next symbol
-
-
-    def set_symbols(self, symbols, colors):
-        self.symbols_on_dates = symbols
-        self.colors = colors
+                # Only the dates this ticker leaves or joins are restyled and repainted
+                self.calendar.set_symbol_date(ticker, date, self.colors[ticker])
 
 
 if __name__ == '__main__':
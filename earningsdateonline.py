@@ -1,14 +1,92 @@
 import streamlit as st
 from yahooquery import Ticker
 import pandas as pd
+import asyncio
 import random
+import time
 from datetime import datetime, timedelta
 import calendar
+from async_fetch import fetch_all
+from earnings_store import EarningsStore
+
+RENDER_INTERVAL = 0.5  # Minimum seconds between calendar redraws while dates are arriving
 
 # Random color generator
 def random_color():
     return "#{:06x}".format(random.randint(0, 0xFFFFFF))
 
+def fetch_earnings_date(ticker):
+    """
+    Next earnings date of one ticker (None if none is scheduled).
+
+    Runs on fetch_all's worker threads, where st.cache_data has no script context, so reruns are
+    memoized by the EarningsStore lookup on the script thread instead.
+    """
+    cal = Ticker(ticker).calendar_events
+    earnings_data = cal.get(ticker, {}).get("earnings", {})
+    earnings_dates = earnings_data.get("earningsDate", [])
+    if not earnings_dates:
+        return None
+    date_str = earnings_dates[0].split()[0]
+    return datetime.strptime(date_str, "%Y-%m-%d").date()
+
+@st.cache_data(show_spinner=False)
+def month_table(year, month, day_badges):
+    """
+    Markdown table of one month, memoized so months whose events did not change are not rebuilt.
+
+    Args:
+        year (int): The year.
+        month (int): The month.
+        day_badges (tuple): ((day of month, ((ticker, color), ...)), ...) for the days with events.
+    """
+    badges = dict(day_badges)
+    month_days = [datetime(year, month, d).date() for d in range(1, calendar.monthrange(year, month)[1] + 1)]
+    weeks = []
+    week = []
+    for day in month_days:
+        if day.weekday() == 0 and week:  # Monday start
+            weeks.append(week)
+            week = []
+        week.append(day)
+    if week:
+        weeks.append(week)
+
+    # Display as markdown table
+    table_md = "| Mon | Tue | Wed | Thu | Fri | Sat | Sun |\n|---|---|---|---|---|---|---|\n"
+    for week in weeks:
+        row = []
+        for i in range(7):
+            if i < len(week):
+                day = week[i]
+                cell = f"**{day.day}**"
+                for ticker, color in badges.get(day.day, ()):
+                    cell += f"<br><span style='background-color:{color};color:white;padding:2px 4px;border-radius:4px'>{ticker}</span>"
+                row.append(cell)
+            else:
+                row.append("")
+        table_md += "|" + "|".join(row) + "|\n"
+    return table_md
+
+def render_calendar(placeholder, events, colors, order):
+    """Redraw every month between the first and last event date into `placeholder`."""
+    if not events:
+        return
+    all_dates = list(events.keys())
+    start_month = min(all_dates).replace(day=1)
+    end_month = max(all_dates).replace(day=calendar.monthrange(max(all_dates).year, max(all_dates).month)[1])
+    current = start_month
+
+    with placeholder.container():
+        while current <= end_month:
+            st.subheader(current.strftime("%B %Y"))
+            day_badges = tuple(
+                (day.day, tuple((ticker, colors[ticker]) for ticker in sorted(events[day], key=order.get)))
+                for day in sorted(events) if (day.year, day.month) == (current.year, current.month)
+            )
+            st.markdown(month_table(current.year, current.month, day_badges), unsafe_allow_html=True)
+            current = (current + timedelta(days=32)).replace(day=1)
+
 st.set_page_config(page_title="Earnings Calendar", layout="wide")
 st.title("📅 Earnings Calendar")
 
@@ -17,61 +95,47 @@ ticker_input = st.text_input("Enter stock tickers (comma-separated)", "AAPL,MSFT
 fetch = st.button("Fetch and Highlight")
 
 if fetch:
-    tickers = [t.strip().upper() for t in ticker_input.split(",") if t.strip()]
-    colors = {}
+    tickers = list(dict.fromkeys(t.strip().upper() for t in ticker_input.split(",") if t.strip()))
+    order = {ticker: i for i, ticker in enumerate(tickers)}
+    # Colors survive reruns, so unchanged months keep hitting the month_table cache
+    colors = st.session_state.setdefault("colors", {})
     events = {}
 
-    for ticker in tickers:
-        try:
-            t = Ticker(ticker)
-            cal = t.calendar_events
-            earnings_data = cal.get(ticker, {}).get("earnings", {})
-            earnings_dates = earnings_data.get("earningsDate", [])
-            if earnings_dates:
-                date_str = earnings_dates[0].split()[0]
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-                events.setdefault(date_obj, []).append(ticker)
-                if ticker not in colors:
-                    colors[ticker] = random_color()
-        except Exception as e:
-            st.warning(f"Error fetching {ticker}: {e}")
-
-    # Pick month range based on min/max event date
-    if events:
-        all_dates = list(events.keys())
-        start_month = min(all_dates).replace(day=1)
-        end_month = max(all_dates).replace(day=calendar.monthrange(max(all_dates).year, max(all_dates).month)[1])
-        current = start_month
+    def add_earnings_date(ticker, date_obj):
+        if date_obj:
+            events.setdefault(date_obj, []).append(ticker)
+            if ticker not in colors:
+                colors[ticker] = random_color()
 
-        while current <= end_month:
-            st.subheader(current.strftime("%B %Y"))
-            month_days = [datetime(current.year, current.month, d).date() for d in range(1, calendar.monthrange(current.year, current.month)[1] + 1)]
-            weeks = []
-            week = []
-            for day in month_days:
-                if day.weekday() == 0 and week:  # Monday start
-                    weeks.append(week)
-                    week = []
-                week.append(day)
-            if week:
-                weeks.append(week)
-
-            # Display as markdown table
-            table_md = "| Mon | Tue | Wed | Thu | Fri | Sat | Sun |\n|---|---|---|---|---|---|---|\n"
-            for week in weeks:
-                row = []
-                for i in range(7):
-                    if i < len(week):
-                        day = week[i]
-                        cell = f"**{day.day}**"
-                        if day in events:
-                            for ticker in events[day]:
-                                color = colors[ticker]
-                                cell += f"<br><span style='background-color:{color};color:white;padding:2px 4px;border-radius:4px'>{ticker}</span>"
-                        row.append(cell)
-                    else:
-                        row.append("")
-                table_md += "|" + "|".join(row) + "|\n"
-
-            st.markdown(table_md, unsafe_allow_html=True)
-            current = (current + timedelta(days=32)).replace(day=1)
+    # Stored dates are drawn right away; only missing or stale symbols go to the network
+    store = EarningsStore()
+    earnings, stale = store.lookup(tickers)
+    for ticker, date_obj in earnings.items():
+        add_earnings_date(ticker, date_obj)
+
+    progress = st.progress(0.0, text=f"Fetching {len(stale)} of {len(tickers)} tickers") if stale else None
+    calendar_view = st.empty()
+    render_calendar(calendar_view, events, colors, order)
+
+    if stale:
+        fetched = {}
+        done = [0]
+        last_render = [time.monotonic()]
+
+        def on_result(ticker, value):
+            done[0] += 1
+            if isinstance(value, str):  # "Error: ..." from fetch_all
+                st.warning(f"Error fetching {ticker}: {value.removeprefix('Error: ')}")
+            else:
+                fetched[ticker] = value
+                add_earnings_date(ticker, value)
+                # Redraw as dates arrive, but not for every single ticker of a long list
+                if value and time.monotonic() - last_render[0] > RENDER_INTERVAL:
+                    render_calendar(calendar_view, events, colors, order)
+                    last_render[0] = time.monotonic()
+            progress.progress(done[0] / len(stale), text=f"Fetched {ticker} ({done[0]}/{len(stale)})")
+
+        asyncio.run(fetch_all(stale, fetch_earnings_date, on_result, max_concurrency=8))
+        store.save(fetched)
+        progress.empty()
+        render_calendar(calendar_view, events, colors, order)
@@ -0,0 +1,46 @@
+from PyQt5.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class WorkerSignals(QObject):
+    """Signals a FetchWorker uses to report back to the GUI thread. Each one carries the worker's tag."""
+    progress = pyqtSignal(object, str)
+    result = pyqtSignal(object, object)
+    error = pyqtSignal(object, str)
+
+
+class FetchWorker(QRunnable):
+    """
+    Runs a blocking fetch function on a QThreadPool thread so the GUI stays responsive.
+
+    The function is called as fn(*args, progress=callable, is_cancelled=callable). Every signal
+    carries `tag` so the receiver can tell which request it answers and ignore stale ones.
+    Once cancelled the worker emits nothing more; a download already in progress is left
+    to finish in the background and its result is dropped.
+    """
+
+    def __init__(self, tag, fn, *args):
+        super().__init__()
+        self.tag = tag
+        self.fn = fn
+        self.args = args
+        self.signals = WorkerSignals()
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+    def report(self, message):
+        if not self.cancelled:
+            self.signals.progress.emit(self.tag, message)
+
+    def run(self):
+        if self.cancelled:
+            return
+        try:
+            result = self.fn(*self.args, progress=self.report, is_cancelled=lambda: self.cancelled)
+        except Exception as e:
+            if not self.cancelled:
+                self.signals.error.emit(self.tag, str(e))
+            return
+        if not self.cancelled:
+            self.signals.result.emit(self.tag, result)
@@ -0,0 +1,284 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from bar_cache import cached_download
+from option_pricing import RISK_FREE_RATE, atm_volatility, years_to_expiry
+
+DEFAULT_SEED = 42  # Same seed, same paths, same statistics
+TRADING_DAYS = 252
+PERCENTILES = (5, 50, 95)
+HISTOGRAM_BINS = 1 << 16  # Log-price bins of the simulated price distribution
+
+
+def gbm_sampler(spot, vol, years, rate=RISK_FREE_RATE):
+    """
+    Terminal prices of a geometric Brownian motion (lognormal, risk-neutral drift).
+
+    Returns:
+        callable: sample(rng, n) -> n terminal prices.
+    """
+    drift = (rate - 0.5 * vol * vol) * years
+    scale = vol * np.sqrt(years)
+
+    def sample(rng, n):
+        return spot * np.exp(drift + scale * rng.standard_normal(n))
+    return sample
+
+
+def bootstrap_sampler(spot, daily_log_returns, days, max_bytes=64 * 1024 ** 2):
+    """
+    Terminal prices built by resampling historical daily log returns, `days` per path.
+
+    Paths are drawn in sub-batches so the (paths x days) draw never exceeds `max_bytes`.
+
+    Returns:
+        callable: sample(rng, n) -> n terminal prices.
+    """
+    daily_log_returns = np.asarray(daily_log_returns, dtype=float)
+    days = max(int(days), 1)
+    batch = max(1, max_bytes // (days * daily_log_returns.itemsize))
+
+    def sample(rng, n):
+        total = np.empty(n)
+        for start in range(0, n, batch):
+            size = min(batch, n - start)
+            total[start:start + size] = daily_log_returns[rng.integers(0, len(daily_log_returns), (size, days))].sum(axis=1)
+        return spot * np.exp(total)
+    return sample
+
+
+def historical_log_returns(stock_ticker, years=5):
+    """Daily close-to-close log returns of a ticker over the last `years`, read through the bar cache."""
+    start = (datetime.date.today() - datetime.timedelta(days=int(365 * years))).isoformat()
+    close = cached_download(stock_ticker, start=start, multi_level_index=False)["Close"].dropna()
+    return np.diff(np.log(close.to_numpy(dtype=float)))
+
+
+def realized_volatility(daily_log_returns):
+    """Annualized volatility of daily log returns."""
+    return float(np.std(daily_log_returns, ddof=1) * np.sqrt(TRADING_DAYS))
+
+
+class PriceHistogram:
+    """
+    Fixed-size sketch of simulated prices: path counts in equal log-price bins.
+
+    The bins span the first chunk's log-price range padded by half its width on each side, and
+    later prices outside it are counted in the end bins. Probabilities and percentiles read from it
+    are linear within a bin, i.e. exact to well under 0.01% of the price with the default bins.
+    """
+
+    def __init__(self, first_prices, bins=HISTOGRAM_BINS):
+        low, high = np.log(first_prices.min()), np.log(first_prices.max())
+        pad = (high - low) / 2 or 0.5
+        self.edges = np.linspace(low - pad, high + pad, bins + 1)
+        self.counts = np.zeros(bins)
+
+    def add(self, prices):
+        index = np.clip(np.searchsorted(self.edges, np.log(prices), side="right") - 1, 0, len(self.counts) - 1)
+        self.counts += np.bincount(index, minlength=len(self.counts))
+
+    def _cumulative(self):
+        return np.concatenate([[0.0], np.cumsum(self.counts)]) / self.counts.sum()
+
+    def cdf(self, prices):
+        """Fraction of paths at or below each price."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.interp(np.log(prices), self.edges, self._cumulative())
+
+    def quantile(self, q):
+        """Price below which a fraction `q` of the paths lie."""
+        cumulative = self._cumulative()
+        i = np.clip(np.searchsorted(cumulative, q, side="left"), 1, len(self.counts))
+        width = cumulative[i] - cumulative[i - 1]
+        fraction = np.divide(q - cumulative[i - 1], width, out=np.zeros_like(width), where=width > 0)
+        return np.exp(self.edges[i - 1] + fraction * (self.edges[i] - self.edges[i - 1]))
+
+
+class ChainSimulation:
+    """
+    Monte Carlo statistics of a chain's contracts, accumulated chunk by chunk in bounded memory.
+
+    Paths are never kept. A contract's payoff at expiration only depends on the terminal price, and
+    monotonically, so each chunk only adds its path count and price sum to the interval between
+    consecutive strikes it falls in, which gives every expected payoff exactly, and its prices to a
+    PriceHistogram, which gives the probabilities of profit and the percentiles. Memory is set by
+    the number of strikes and histogram bins, whatever the number of paths.
+
+    Nothing is accumulated after commission, so statistics() re-reads them for any commission.
+    """
+
+    def __init__(self, strike, premium, is_call, percentiles=PERCENTILES):
+        self.strike = strike
+        self.premium = premium
+        self.is_call = is_call
+        self.percentiles = percentiles
+        self.strikes = np.unique(strike)
+        # Paths and price sums per interval: below the first strike, between strikes, above the last
+        self.counts = np.zeros(len(self.strikes) + 1)
+        self.sums = np.zeros(len(self.strikes) + 1)
+        self.histogram = None
+
+    @property
+    def n_paths(self):
+        return int(self.counts.sum())
+
+    def add(self, prices):
+        """Accumulates one chunk of simulated prices at expiration."""
+        if self.histogram is None:
+            self.histogram = PriceHistogram(prices)
+        self.histogram.add(prices)
+        # Strikes below each price, so a price equal to a strike counts as at or below it
+        interval = np.searchsorted(self.strikes, prices, side="left")
+        self.counts += np.bincount(interval, minlength=len(self.counts))
+        self.sums += np.bincount(interval, weights=prices, minlength=len(self.sums))
+
+    def expected_payoff(self):
+        """Expected payoff of one contract (100 shares), before premium and commission."""
+        n = self.counts.sum()
+        position = np.searchsorted(self.strikes, self.strike)
+        # Paths at or below each strike, and the sum of their prices
+        below = np.cumsum(self.counts)[position]
+        below_sum = np.cumsum(self.sums)[position]
+        call_payoff = (self.sums.sum() - below_sum - self.strike * (n - below)) / n
+        put_payoff = (self.strike * below - below_sum) / n
+        return np.where(self.is_call, call_payoff, put_payoff) * 100
+
+    def statistics(self, commission=0.0):
+        """
+        Expected profit, probability of profit and profit percentiles for one contract (100 shares) each.
+
+        Returns:
+            dict: Column name -> array.
+        """
+        cost = self.premium * 100 + commission
+        # Profitable once the move past the strike pays back premium and commission
+        threshold = np.where(self.is_call, self.strike + cost / 100, self.strike - cost / 100)
+        below = self.histogram.cdf(threshold)
+        prob_profit = np.where(self.is_call, 1 - below, below)
+
+        columns = {"expected_profit": np.round(self.expected_payoff() - cost, 2), "prob_profit": np.round(prob_profit, 4)}
+        for q in self.percentiles:
+            # Calls gain as the price rises, puts as it falls
+            call_price = self.histogram.quantile(q / 100)
+            put_price = self.histogram.quantile(1 - q / 100)
+            payoff = np.where(self.is_call, np.maximum(call_price - self.strike, 0), np.maximum(self.strike - put_price, 0))
+            columns[f"profit_p{q}"] = np.round(payoff * 100 - cost, 2)
+        return columns
+
+
+def simulate(simulation, sample, n_paths=1_000_000, chunk_paths=250_000, seed=DEFAULT_SEED,
+             is_cancelled=lambda: False):
+    """
+    Draws `n_paths` prices at expiration in chunks of `chunk_paths` into a ChainSimulation.
+
+    Only one chunk is in memory at a time, so `n_paths` is not limited by memory.
+
+    Returns:
+        ChainSimulation: `simulation`, or None if cancelled.
+    """
+    rng = np.random.default_rng(seed)
+    for start in range(0, n_paths, chunk_paths):
+        if is_cancelled():
+            return None
+        simulation.add(sample(rng, min(chunk_paths, n_paths - start)))
+    return simulation
+
+
+def contract_statistics(terminal_prices, strike, premium, is_call, commission=0.0, percentiles=PERCENTILES):
+    """
+    Expected profit, probability of profit and profit percentiles of every contract over given prices.
+
+    Args:
+        terminal_prices (np.ndarray): Simulated prices at expiration.
+        strike (np.ndarray): Strike prices.
+        premium (np.ndarray): Premiums paid per share.
+        is_call (np.ndarray): True for calls, False for puts.
+        commission (float): Commission paid per contract.
+        percentiles (tuple): Profit percentiles to report.
+
+    Returns:
+        dict: Column name -> array, for one contract (100 shares) each.
+    """
+    simulation = ChainSimulation(strike, premium, is_call, percentiles)
+    simulation.add(terminal_prices)
+    return simulation.statistics(commission)
+
+
+def simulate_chain(table, sample, n_paths=1_000_000, chunk_paths=250_000, seed=DEFAULT_SEED,
+                   percentiles=PERCENTILES, is_cancelled=lambda: False):
+    """
+    Monte Carlo simulation of every contract of a chain.
+
+    Args:
+        table (pd.DataFrame): Contracts with "Type", "strike" and "premium" columns (see chain_invariants),
+            or None to simulate the price only.
+        sample (callable): Terminal price sampler, e.g. from gbm_sampler or bootstrap_sampler.
+        n_paths (int): Number of simulated paths.
+        chunk_paths (int): Paths drawn at a time.
+        seed (int): Random seed.
+        percentiles (tuple): Profit percentiles to report.
+        is_cancelled (callable): Returns True once the result is no longer wanted.
+
+    Returns:
+        ChainSimulation: The statistics of the table's contracts, in table order, for any commission,
+            or None if cancelled.
+    """
+    if table is None:
+        simulation = ChainSimulation(np.empty(0), np.empty(0), np.empty(0, dtype=bool), percentiles)
+    else:
+        simulation = ChainSimulation(
+            table["strike"].to_numpy(dtype=float),
+            table["premium"].to_numpy(dtype=float),
+            (table["Type"].str.lower() == "call").to_numpy(),
+            percentiles,
+        )
+    return simulate(simulation, sample, n_paths, chunk_paths, seed, is_cancelled)
+
+
+def predict_prices(stock_ticker, stock_price, expiration_date=None, table=None, bootstrap=False,
+                   n_paths=1_000_000, seed=DEFAULT_SEED, progress=lambda message: None, is_cancelled=lambda: False):
+    """
+    Simulates a ticker's price at expiration and, if a chain is given, the statistics of its contracts.
+
+    Paths are lognormal with the at-the-money implied volatility of the chain (realized volatility
+    of the cached daily bars when there is none), or resampled from those bars with `bootstrap`.
+
+    Args:
+        stock_ticker (str): The stock ticker symbol.
+        stock_price (float): The current stock price.
+        expiration_date (str): The expiration date in "YYYY-MM-DD" format; 30 days ahead when None.
+        table (pd.DataFrame): The chain (see ChainReturns.table), or None for the price only.
+        bootstrap (bool): Resample historical daily returns instead of drawing lognormal prices.
+        n_paths (int): Number of simulated paths.
+        seed (int): Random seed.
+        progress (callable): Receives progress messages.
+        is_cancelled (callable): Returns True once the result is no longer wanted.
+
+    Returns:
+        tuple: (5th, 50th and 95th percentile prices, ChainSimulation or None), or None if cancelled.
+    """
+    years = float(years_to_expiry(expiration_date)) if expiration_date else 30 / 365
+    if bootstrap:
+        days = max(1, round(years * TRADING_DAYS))
+        sample = bootstrap_sampler(stock_price, historical_log_returns(stock_ticker), days)
+        method = f"{days} resampled trading days"
+    else:
+        vol = atm_volatility(table, stock_price)
+        source = "implied"
+        if not np.isfinite(vol):
+            vol = realized_volatility(historical_log_returns(stock_ticker))
+            source = "realized"
+        sample = gbm_sampler(stock_price, vol, years)
+        method = f"lognormal, {vol:.0%} {source} volatility"
+    if is_cancelled():
+        return None
+
+    simulation = simulate_chain(table, sample, n_paths, seed=seed, is_cancelled=is_cancelled)
+    if simulation is None:
+        return None
+    progress(f"Simulated {n_paths:,} paths ({method}).")
+    quantiles = simulation.histogram.quantile(np.array(PERCENTILES) / 100)
+    return quantiles, (simulation if table is not None else None)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+# Band edges (daily % change) and the category of each band, from most negative to most positive
+DEFAULT_EDGES = [-1.2, -0.5, 0.5, 1.2]
+DEFAULT_LABELS = ['big Dip', 'Dip', 'Neutral', 'Up', 'big Up']
+
+
+def classify_codes(changes, edges=DEFAULT_EDGES):
+    """
+    Bins % changes into bands and returns the band numbers as int8.
+
+    A change sitting exactly on an edge goes to the band closer to zero, so with the default
+    edges -0.5 and 0.5 are Neutral while -1.2 is a Dip and 1.2 is Up. NaN gets code -1.
+
+    Args:
+        changes (array-like): % changes of any shape.
+        edges (list): Sorted band edges.
+
+    Returns:
+        np.ndarray: int8 band numbers with the same shape as `changes`.
+    """
+    values = np.asarray(changes, dtype=float)
+    edges = np.asarray(edges, dtype=float)
+    codes = np.where(
+        values < 0,
+        np.searchsorted(edges, values, side='right'),
+        np.searchsorted(edges, values, side='left'),
+    ).astype(np.int8)
+    codes[np.isnan(values)] = -1
+    return codes
+
+
+def classify_moves(changes, edges=DEFAULT_EDGES, labels=DEFAULT_LABELS):
+    """
+    Vectorized replacement for categorizing daily % changes one row at a time.
+
+    Args:
+        changes (pd.Series or pd.DataFrame): Daily % changes, e.g. one column per ticker.
+        edges (list): Sorted band edges (e.g., [-1.2, -0.5, 0.5, 1.2]).
+        labels (list): Category names, one more than the number of edges.
+
+    Returns:
+        pd.Series or pd.DataFrame: The same shape as `changes`, with categorical columns.
+    """
+    if len(labels) != len(edges) + 1:
+        raise ValueError("Need exactly one more label than band edges.")
+    codes = classify_codes(changes, edges)
+    categories = pd.CategoricalDtype(labels, ordered=True)
+
+    if isinstance(changes, pd.Series):
+        return pd.Series(pd.Categorical.from_codes(codes, dtype=categories), index=changes.index, name=changes.name)
+    return pd.DataFrame(
+        {column: pd.Categorical.from_codes(codes[:, i], dtype=categories) for i, column in enumerate(changes.columns)},
+        index=changes.index,
+    )
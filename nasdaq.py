@@ -1,5 +1,7 @@
 import yfinance as yf
 import pandas as pd
+from bar_cache import cached_download
+from move_categories import classify_moves
 
 # Define the ticker symbol for NASDAQ Composite Index
 ticker = '^IXIC'
@@ -9,7 +11,7 @@ start_date = '2025-01-01'
 end_date = '2025-02-28'
 
 # Fetch the historical data (disable auto-adjustment to get "Adj Close")
-data = yf.download(ticker, start=start_date, end=end_date, auto_adjust=False)
+data = cached_download(ticker, start=start_date, end=end_date, auto_adjust=False, multi_level_index=False)
 
 # Check column names
 if 'Adj Close' in data.columns:
@@ -21,21 +23,10 @@ else:
 # Drop NaN values (first row will have NaN)
 data = data.dropna()
 
-# Categorize percentage change
-def categorize_change(change):
-    if -0.5 <= change <= 0.5:
-        return 'Neutral'
-    elif change < -1.2:
-        return 'big Dip'
-    elif change > 1.2:
-        return 'big Up'
-    elif change < -0.5:
-        return 'Dip'
-    else:
-        return 'Up'
-
-# Apply the categorization function
-data['Category'] = data['Daily % Change'].apply(categorize_change)
+# Categorize percentage change: band edges in %, and one category per band
+band_edges = [-1.2, -0.5, 0.5, 1.2]
+band_labels = ['big Dip', 'Dip', 'Neutral', 'Up', 'big Up']
+data['Category'] = classify_moves(data['Daily % Change'], band_edges, band_labels)
 
 # Display the result
 result = data[['Close', 'Daily % Change', 'Category']]
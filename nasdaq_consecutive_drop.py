@@ -1,24 +1,21 @@
 import pandas as pd
 import yfinance as yf
+from bar_cache import cached_download
+from streaks import count_streaks
 
 # Fetch NASDAQ historical data for 2022
 ticker = "^IXIC"  # NASDAQ Composite Index
-nasdaq_data = yf.download(ticker, start="2022-01-01", end="2023-01-01", auto_adjust=False)
+threshold = 0.0  # Daily % change a day has to fall below to extend the streak
+streak_length = 5  # Number of consecutive days in a streak
+nasdaq_data = cached_download(ticker, start="2022-01-01", end="2023-01-01", auto_adjust=False,
+                              multi_level_index=False)
 
 # Calculate daily percentage change
 nasdaq_data["Pct_Change"] = nasdaq_data["Adj Close"].pct_change() * 100
 
-# Find consecutive days where % change is below -1%
-count = 0
-streak = 0
+# Count streaks of consecutive days where % change is below the threshold (overlapping windows)
+counts, streaks = count_streaks(nasdaq_data["Pct_Change"], [streak_length], threshold=threshold)
+count = counts["overlapping", streak_length].iloc[0]
 
-for change in nasdaq_data["Pct_Change"]:
-    if change < 0:
-        streak += 1
-        if streak == 5:
-            count += 1
-            streak -= 1  # To allow overlapping sequences
-    else:
-        streak = 0  # Reset streak if condition breaks
-
-print(f"Number of times NASDAQ dropped more than 1% for 5 consecutive days in 2022: {count}")
+print(f"Number of times NASDAQ fell more than {abs(threshold)}% for {streak_length} consecutive days in 2022: {count}")
+print(streaks[["start", "end", "length"]])
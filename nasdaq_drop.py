@@ -1,80 +1,156 @@
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import os
-import matplotlib.pyplot as plt
-
-# Parameters
-ticker = "^IXIC"
-year = "2024"
-start_date = year + "-01-01"
-end_date = year + "-12-31"
-threshold = -2.5  # Threshold for drops in percentage (negative for drops)
-
-# Determine threshold direction
-if threshold < 0:
-    name1 = "drops"
-    name2 = "fell"
-else:
-    name1 = "increases"
-    name2 = "rose"
-
-# Download data
-data = yf.download(ticker, start=start_date, end=end_date, auto_adjust=False)
-
-# Calculate daily percentage changes
-data['Daily Change (%)'] = data['Adj Close'].pct_change() * 100
-
-# Filter days exceeding the threshold
-if threshold < 0:
-    extreme_days = data[data['Daily Change (%)'] <= threshold]
-else:
-    extreme_days = data[data['Daily Change (%)'] >= threshold]
-extreme_days = extreme_days[['Daily Change (%)']]
-
-# Generate summary statistics
-average_change = data['Daily Change (%)'].mean()
-max_change = data['Daily Change (%)'].max()
-min_change = data['Daily Change (%)'].min()
-std_dev_change = data['Daily Change (%)'].std()
-
-# Print summary
-print(f"Summary for NASDAQ in {start_date[:4]}:")
-print(f"Average Daily Change: {average_change:.2f}%")
-print(f"Max Daily Change: {max_change:.2f}%")
-print(f"Min Daily Change: {min_change:.2f}%")
-print(f"Standard Deviation: {std_dev_change:.2f}%\n")
-
-# Print extreme days
-print(f"Days in {start_date[:4]} where NASDAQ {name2} more than {abs(threshold)}%:")
-pd.set_option('display.max_rows', None)
-print(extreme_days)
-print(f"Number of such days: {len(extreme_days)}")
-
-# Save results
-output_dir = "nasdaq_drop"
-os.makedirs(output_dir, exist_ok=True)
-output_file = f"{output_dir}/nasdaq_{name1}_beyond_{abs(threshold)}pct_{start_date[:4]}.csv"
-extreme_days.to_csv(output_file, index=True)
-print(f"Results saved to {output_file}")
-
-# Plot data
-plt.figure(figsize=(12, 6))
-plt.plot(data['Adj Close'], label='Adjusted Close Price')
-plt.title(f"NASDAQ Performance in {start_date[:4]}")
-plt.xlabel('Date')
-plt.ylabel('Price')
-plt.legend()
-plt.grid()
-plt.savefig(f"{output_dir}/nasdaq_performance_{start_date[:4]}.png")
-plt.show()
-
-plt.figure(figsize=(12, 6))
-plt.hist(data['Daily Change (%)'].dropna(), bins=50, alpha=0.75)
-plt.axvline(threshold, color='r', linestyle='--', label=f'Threshold: {threshold}%')
-plt.title(f"Distribution of Daily Percentage Changes in {start_date[:4]}")
-plt.xlabel('Daily Change (%)')
-plt.ylabel('Frequency')
-plt.legend()
-plt.grid()
-plt.savefig(f"{output_dir}/nasdaq_daily_change_distribution_{start_date[:4]}.png")
-plt.show()
+from bar_cache import cached_download
+from render_pool import render_pool, plot_lines, plot_histogram, wait_for_charts
+
+
+def sweep_extreme_days(changes, years, thresholds):
+    """
+    Computes summary statistics and extreme days for every (year, threshold, direction) in one pass.
+
+    Args:
+        changes (pd.Series): Daily % changes indexed by date, covering all the years.
+        years (list): Years to report (e.g., range(2016, 2026)).
+        thresholds (list): Move sizes in percent, without sign (e.g., [1.2, 1.5, 2, 2.5]).
+
+    Returns:
+        tuple: (pd.DataFrame with one summary row per year/direction/threshold,
+                dict mapping (year, direction, signed threshold) to that combination's extreme days)
+    """
+    changes = changes.dropna()
+    changes = changes[changes.index.year.isin(list(years))].rename('Daily Change (%)')
+    year = pd.Index(changes.index.year, name='year')
+
+    # Per year statistics, shared by every threshold
+    stats = changes.groupby(year).agg(['count', 'mean', 'max', 'min', 'std'])
+    stats.columns = ['trading_days', 'average_change', 'max_change', 'min_change', 'std_dev_change']
+
+    # (days x thresholds) hit matrices for both directions
+    limits = np.abs(np.asarray(thresholds, dtype=float))
+    values = changes.to_numpy()[:, None]
+    hit_matrices = {"drops": values <= -limits, "increases": values >= limits}
+
+    summary = []
+    extreme_days = {}
+    for direction, hits in hit_matrices.items():
+        signed = -limits if direction == "drops" else limits
+        counts = pd.DataFrame(hits, index=year, columns=signed).groupby(level=0).sum()
+        counts = counts.reindex(stats.index, fill_value=0).reset_index()
+        counts = counts.melt(id_vars='year', var_name='threshold', value_name='days')
+        counts.insert(1, 'direction', direction)
+        summary.append(counts)
+
+        for column, threshold in enumerate(signed):
+            selected = changes[hits[:, column]]
+            by_year = dict(list(selected.groupby(selected.index.year)))
+            for y in stats.index:
+                extreme_days[(y, direction, threshold)] = by_year.get(y, selected.iloc[0:0]).to_frame()
+
+    summary = pd.concat(summary, ignore_index=True).merge(stats.reset_index(), on='year')
+    return summary.sort_values(['year', 'direction', 'threshold'], ignore_index=True), extreme_days
+
+def run_sweep(ticker, years, thresholds, output_dir="nasdaq_drop/sweep"):
+    """
+    Download the full history once, then write every year/threshold CSV plus a combined summary.
+
+    The tables are written to their own directory: unlike single mode, they have a one-row header
+    and include each year's first trading day and December 31, so they must not replace its files.
+    """
+    years = sorted(years)
+    # Start a month early so the first trading day of the first year has a change too
+    data = cached_download(ticker, start=f"{years[0] - 1}-12-01", end=f"{years[-1] + 1}-01-01",
+                           auto_adjust=False, multi_level_index=False)
+    changes = data['Adj Close'].pct_change() * 100
+
+    summary, extreme_days = sweep_extreme_days(changes, years, thresholds)
+
+    os.makedirs(output_dir, exist_ok=True)
+    for (year, direction, threshold), days in extreme_days.items():
+        days.to_csv(f"{output_dir}/nasdaq_{direction}_beyond_{abs(threshold):g}pct_{year}.csv", index=True)
+    summary_file = f"{output_dir}/nasdaq_sweep_summary_{years[0]}_{years[-1]}.csv"
+    summary.to_csv(summary_file, index=False)
+
+    pd.set_option('display.max_rows', None)
+    print(summary)
+    print(f"Saved {len(extreme_days)} extreme day tables and the summary to {summary_file}")
+
+if __name__ == "__main__":
+    # Parameters
+    ticker = "^IXIC"
+    year = "2024"
+    start_date = year + "-01-01"
+    end_date = year + "-12-31"
+    threshold = -2.5  # Threshold for drops in percentage (negative for drops)
+    headless = True  # Render charts to PNG in a process pool instead of showing them
+    sweep = False  # Analyze every year/threshold below in one pass instead of the single year above
+    sweep_years = range(2016, 2026)
+    sweep_thresholds = [1.2, 1.5, 2, 2.5, 2.7]
+
+    if sweep:
+        run_sweep(ticker, sweep_years, sweep_thresholds)
+    else:
+        # Determine threshold direction
+        if threshold < 0:
+            name1 = "drops"
+            name2 = "fell"
+        else:
+            name1 = "increases"
+            name2 = "rose"
+
+        # Download data
+        data = cached_download(ticker, start=start_date, end=end_date, auto_adjust=False)
+
+        # Calculate daily percentage changes
+        data['Daily Change (%)'] = data['Adj Close'].pct_change() * 100
+
+        # Filter days exceeding the threshold
+        if threshold < 0:
+            extreme_days = data[data['Daily Change (%)'] <= threshold]
+        else:
+            extreme_days = data[data['Daily Change (%)'] >= threshold]
+        extreme_days = extreme_days[['Daily Change (%)']]
+
+        # Generate summary statistics
+        average_change = data['Daily Change (%)'].mean()
+        max_change = data['Daily Change (%)'].max()
+        min_change = data['Daily Change (%)'].min()
+        std_dev_change = data['Daily Change (%)'].std()
+
+        # Print summary
+        print(f"Summary for NASDAQ in {start_date[:4]}:")
+        print(f"Average Daily Change: {average_change:.2f}%")
+        print(f"Max Daily Change: {max_change:.2f}%")
+        print(f"Min Daily Change: {min_change:.2f}%")
+        print(f"Standard Deviation: {std_dev_change:.2f}%\n")
+
+        # Print extreme days
+        print(f"Days in {start_date[:4]} where NASDAQ {name2} more than {abs(threshold)}%:")
+        pd.set_option('display.max_rows', None)
+        print(extreme_days)
+        print(f"Number of such days: {len(extreme_days)}")
+
+        # Save results
+        output_dir = "nasdaq_drop"
+        os.makedirs(output_dir, exist_ok=True)
+        output_file = f"{output_dir}/nasdaq_{name1}_beyond_{abs(threshold)}pct_{start_date[:4]}.csv"
+        extreme_days.to_csv(output_file, index=True)
+        print(f"Results saved to {output_file}")
+
+        # Plot data
+        charts = [
+            (plot_lines, f"{output_dir}/nasdaq_performance_{start_date[:4]}.png",
+             [(data.index, data['Adj Close'].to_numpy(), 'Adjusted Close Price', None)],
+             f"NASDAQ Performance in {start_date[:4]}", 'Date', 'Price', (12, 6)),
+            (plot_histogram, f"{output_dir}/nasdaq_daily_change_distribution_{start_date[:4]}.png",
+             data['Daily Change (%)'].dropna().to_numpy().ravel(),
+             f"Distribution of Daily Percentage Changes in {start_date[:4]}", 'Daily Change (%)', 'Frequency',
+             50, threshold),
+        ]
+        if headless:
+            with render_pool() as pool:
+                wait_for_charts([pool.submit(*chart) for chart in charts])
+        else:
+            for chart in charts:
+                chart[0](*chart[1:], show=True)
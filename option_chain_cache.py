@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+from yahooquery import Ticker
+
+OPTION_TYPES = {"calls": "Call", "puts": "Put"}
+
+
+def fetch_option_chain(stock_ticker):
+    """
+    Downloads the full option chain (every expiry) for one ticker.
+
+    Args:
+        stock_ticker (str): The stock ticker symbol (e.g., "SOUN").
+
+    Returns:
+        pd.DataFrame: The chain indexed by (symbol, expiration, optionType).
+    """
+    chain = Ticker(stock_ticker).option_chain
+    # yahooquery returns a message string instead of a DataFrame when there is no chain
+    if not isinstance(chain, pd.DataFrame) or chain.empty:
+        raise ValueError(f"No options data available for {stock_ticker}.")
+    return chain
+
+
+def expiration_dates(chain):
+    """Return the chain's expiries as sorted "YYYY-MM-DD" strings, read from the expiration index level."""
+    expirations = chain.index.get_level_values("expiration").unique().sort_values()
+    return [pd.Timestamp(date).strftime("%Y-%m-%d") for date in expirations]
+
+
+def chain_slice(chain, stock_ticker, expiry_date):
+    """
+    Selects the calls and puts of one expiry from a full chain.
+
+    Args:
+        chain (pd.DataFrame): Chain indexed by (symbol, expiration, optionType).
+        stock_ticker (str): The stock ticker symbol.
+        expiry_date (str): The expiration date in "YYYY-MM-DD" format.
+
+    Returns:
+        pd.DataFrame: The contracts of that expiry with a "Type" column ("Call"/"Put").
+    """
+    contracts = chain.loc[(stock_ticker, pd.Timestamp(expiry_date))].reset_index()
+    contracts.insert(0, "Type", contracts.pop("optionType").map(OPTION_TYPES))
+    return contracts
+
+
+def flatten_chain(chain):
+    """
+    Turns a chain indexed by (symbol, expiration, optionType) into plain columns.
+
+    Args:
+        chain (pd.DataFrame): One ticker's chain, every expiry.
+
+    Returns:
+        pd.DataFrame: One row per contract with "expiry" ("YYYY-MM-DD") and "Type" ("Call"/"Put") columns first.
+    """
+    rows = chain.reset_index().drop(columns="symbol")
+    rows.insert(0, "expiry", pd.to_datetime(rows.pop("expiration")).dt.strftime("%Y-%m-%d"))
+    rows.insert(1, "Type", rows.pop("optionType").map(OPTION_TYPES))
+    return rows
+
+
+class OptionChainCache:
+    """
+    In-memory option chains keyed by ticker, refreshed after `ttl` seconds and
+    evicted least-recently-used first once they take more than `max_bytes`.
+    Safe to share between threads.
+    """
+
+    def __init__(self, ttl=300, max_bytes=256 * 1024 ** 2, fetch=fetch_option_chain):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.fetch = fetch
+        self._chains = OrderedDict()  # ticker -> (fetched at, size in bytes, chain)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, stock_ticker, refresh=False):
+        """Return the ticker's chain, downloading it only when missing, stale or `refresh` is set."""
+        with self._lock:
+            entry = self._chains.get(stock_ticker)
+            if entry is not None and not refresh and time.monotonic() - entry[0] < self.ttl:
+                self._chains.move_to_end(stock_ticker)
+                return entry[2]
+
+        # Download outside the lock so other tickers are not blocked meanwhile
+        return self.put(stock_ticker, self.fetch(stock_ticker))
+
+    def put(self, stock_ticker, chain):
+        """Store a chain, evicting the least recently used ones if over the memory budget."""
+        # A sorted index makes per-expiry slices a binary search instead of a scan
+        chain = chain.sort_index()
+        size = int(chain.memory_usage(deep=True).sum())
+        with self._lock:
+            self._remove(stock_ticker)
+            self._chains[stock_ticker] = (time.monotonic(), size, chain)
+            self._bytes += size
+            # Always keep the newest chain, even if it alone is over budget
+            while self._bytes > self.max_bytes and len(self._chains) > 1:
+                self._remove(next(iter(self._chains)))
+        return chain
+
+    def invalidate(self, stock_ticker):
+        """Drop a ticker's chain so the next `get` downloads it again."""
+        with self._lock:
+            self._remove(stock_ticker)
+
+    def _remove(self, stock_ticker):
+        entry = self._chains.pop(stock_ticker, None)
+        if entry is not None:
+            self._bytes -= entry[1]
@@ -0,0 +1,233 @@
+import numpy as np
+import pandas as pd
+
+RISK_FREE_RATE = 0.04  # Annualized, continuously compounded
+MARKET_CLOSE_HOUR = 16  # Contracts expire at the close of their expiration date
+GREEK_COLUMNS = ["implied_vol", "delta", "gamma", "theta", "vega"]
+
+
+def norm_pdf(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+
+def norm_cdf(x):
+    """Standard normal CDF through a Chebyshev fit of erfc (relative error below 1.2e-7, no SciPy needed)."""
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.5 * z)
+    erfc = t * np.exp(-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+        -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (-0.82215223 + t * 0.17087277)))))))))
+    return np.where(x < 0, 0.5 * erfc, 1 - 0.5 * erfc)
+
+
+def years_to_expiry(expiration_date, now=None):
+    """Years from `now` (local time) to the market close of the expiration date(s); 0 once expired."""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    expiry = pd.to_datetime(expiration_date) + pd.Timedelta(hours=MARKET_CLOSE_HOUR)
+    seconds = np.asarray((expiry - now) / pd.Timedelta(seconds=1), dtype=float)
+    return np.maximum(seconds, 0) / (365 * 24 * 60 * 60)
+
+
+def _d1_d2(spot, strike, years, vol, rate):
+    vol_sqrt_t = vol * np.sqrt(years)
+    d1 = (np.log(spot / strike) + (rate + 0.5 * vol * vol) * years) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t
+
+
+def black_scholes_price(spot, strike, years, vol, is_call, rate=RISK_FREE_RATE):
+    """European option price per share, vectorized over every argument."""
+    d1, d2 = _d1_d2(spot, strike, years, vol, rate)
+    discounted_strike = strike * np.exp(-rate * years)
+    call = spot * norm_cdf(d1) - discounted_strike * norm_cdf(d2)
+    # Put-call parity
+    return np.where(is_call, call, call - spot + discounted_strike)
+
+
+def implied_volatility(price, spot, strike, years, is_call, rate=RISK_FREE_RATE,
+                       tol=1e-6, max_iter=100, low=1e-4, high=5.0):
+    """
+    Solves the Black-Scholes implied volatility of many contracts at once.
+
+    Every contract keeps a [low, high] bracket around its root: it takes a Newton step when that
+    step stays inside the bracket and bisects otherwise, so the solve cannot diverge. Contracts
+    drop out of the iteration as soon as they converge.
+
+    Args:
+        price (np.ndarray): Option prices per share.
+        spot (float or np.ndarray): Stock prices.
+        strike (np.ndarray): Strike prices.
+        years (float or np.ndarray): Time to expiration in years.
+        is_call (np.ndarray): True for calls, False for puts.
+        rate (float): Risk-free rate.
+        tol (float): Price tolerance in dollars.
+        max_iter (int): Iteration cap.
+        low (float): Lowest volatility searched.
+        high (float): Highest volatility searched.
+
+    Returns:
+        tuple: (implied volatility array, NaN where unsolved; converged mask)
+    """
+    price, spot, strike, years, is_call = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (price, spot, strike, years)), np.asarray(is_call, dtype=bool))
+    vol = np.full(price.shape, np.nan)
+    converged = np.zeros(price.shape, dtype=bool)
+
+    # Prices outside the no-arbitrage bounds have no implied volatility
+    with np.errstate(invalid="ignore"):
+        discounted_strike = strike * np.exp(-rate * years)
+        lower = np.maximum(np.where(is_call, spot - discounted_strike, discounted_strike - spot), 0)
+        upper = np.where(is_call, spot, discounted_strike)
+        active = np.flatnonzero((years > 0) & (spot > 0) & (strike > 0) & (price > lower) & (price < upper))
+
+    p, s, k, t, c = price[active], spot[active], strike[active], years[active], is_call[active]
+    lo = np.full(len(active), low)
+    hi = np.full(len(active), high)
+    # Brenner-Subrahmanyam starting point
+    sigma = np.clip(np.sqrt(2 * np.pi / t) * p / s, low, high)
+    for _ in range(max_iter):
+        if len(active) == 0:
+            break
+        diff = black_scholes_price(s, k, t, sigma, c, rate) - p
+        done = np.abs(diff) < tol
+        vol[active[done]] = sigma[done]
+        converged[active[done]] = True
+
+        keep = ~done
+        active, p, s, k, t, c, sigma, diff, lo, hi = (
+            a[keep] for a in (active, p, s, k, t, c, sigma, diff, lo, hi))
+        # The price increases with volatility, so the sign of the error tightens the bracket
+        hi = np.where(diff > 0, sigma, hi)
+        lo = np.where(diff > 0, lo, sigma)
+        vega = s * norm_pdf(_d1_d2(s, k, t, sigma, rate)[0]) * np.sqrt(t)
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            newton = sigma - diff / vega
+        sigma = np.where((newton > lo) & (newton < hi), newton, (lo + hi) / 2)
+    return vol, converged
+
+
+def greeks(spot, strike, years, vol, is_call, rate=RISK_FREE_RATE):
+    """
+    Black-Scholes delta, gamma, theta (per calendar day) and vega (per volatility point), vectorized.
+
+    Returns:
+        dict: Column name -> array.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        d1, d2 = _d1_d2(spot, strike, years, vol, rate)
+        pdf = norm_pdf(d1)
+        sqrt_t = np.sqrt(years)
+        discounted_strike = strike * np.exp(-rate * years)
+        decay = -spot * pdf * vol / (2 * sqrt_t)
+        theta = np.where(is_call, decay - rate * discounted_strike * norm_cdf(d2),
+                         decay + rate * discounted_strike * norm_cdf(-d2))
+        return {
+            "delta": np.where(is_call, norm_cdf(d1), norm_cdf(d1) - 1),
+            "gamma": pdf / (spot * vol * sqrt_t),
+            "theta": theta / 365,
+            "vega": spot * pdf * sqrt_t / 100,
+        }
+
+
+def chain_greeks(table, stock_price, expiration_date, rate=RISK_FREE_RATE, now=None):
+    """
+    Implied volatility and Greeks of every contract of a chain, solved from the bid/ask mid.
+
+    Args:
+        table (pd.DataFrame): Contracts with "Type", "strike" and "premium" (or "bid"/"ask") columns.
+        stock_price (float): The current stock price.
+        expiration_date (str or array-like): The expiration date, or one per contract.
+        rate (float): Risk-free rate.
+        now (pd.Timestamp): Valuation time; the current time when not given.
+
+    Returns:
+        pd.DataFrame: "implied_vol", "delta", "gamma", "theta" and "vega" columns on the table's index.
+    """
+    price = table["premium"] if "premium" in table.columns else (table["bid"] + table["ask"]) / 2
+    is_call = (table["Type"].str.lower() == "call").to_numpy()
+    strike = table["strike"].to_numpy(dtype=float)
+    years = years_to_expiry(expiration_date, now)
+
+    vol, _ = implied_volatility(price.to_numpy(dtype=float), stock_price, strike, years, is_call, rate)
+    columns = {"implied_vol": vol, **greeks(stock_price, strike, years, vol, is_call, rate)}
+    return pd.DataFrame({name: np.round(values, 4) for name, values in columns.items()}, index=table.index)
+
+
+def atm_volatility(table, stock_price):
+    """Median implied volatility of the contracts struck closest to the stock price, or NaN."""
+    if table is None or "implied_vol" not in table.columns:
+        return np.nan
+    quoted = table[np.isfinite(table["implied_vol"])]
+    if quoted.empty:
+        return np.nan
+    distance = (quoted["strike"] - stock_price).abs()
+    return float(quoted.loc[distance == distance.min(), "implied_vol"].median())
+
+
+def lognormal_payoff(strike, is_call, break_even, forward, vol, years):
+    """
+    Expected payoff per share and probability of finishing past break-even of every contract.
+
+    The price at expiration is taken as lognormal with mean `forward` (e.g., the target price)
+    and volatility `vol`, so each payoff integrates to a Black-76 expression instead of a simulation.
+
+    Args:
+        strike (np.ndarray): Strike prices.
+        is_call (np.ndarray): True for calls, False for puts.
+        break_even (np.ndarray): Break-even prices at expiration.
+        forward (float or np.ndarray): Expected price at expiration; an array of shape (k, 1)
+            broadcasts to one row per forward.
+        vol (float or np.ndarray): Annualized volatility, per contract or shared.
+        years (float): Time to expiration in years.
+
+    Returns:
+        tuple: (expected payoff per share, probability of finishing past break-even)
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Once expired, the price at expiration is the forward itself, whatever the volatility
+        spread = np.where(np.equal(years, 0), 0.0, vol * np.sqrt(years))
+        expired = spread == 0
+        d1 = (np.log(forward / strike) + 0.5 * spread * spread) / spread
+        d2 = d1 - spread
+        call = np.where(expired, np.maximum(forward - strike, 0), forward * norm_cdf(d1) - strike * norm_cdf(d2))
+        put = np.where(expired, np.maximum(strike - forward, 0), strike * norm_cdf(-d2) - forward * norm_cdf(-d1))
+
+        above_break_even = np.where(expired, forward > break_even,
+                                    norm_cdf((np.log(forward / break_even) - 0.5 * spread * spread) / spread))
+        return np.where(is_call, call, put), np.where(is_call, above_break_even, 1 - above_break_even)
+
+
+def expectation_columns(expected_payoff, prob_break_even, premium, commission=0.0):
+    """
+    Rounded expectation columns of one contract from its expected payoff per share (see lognormal_payoff).
+
+    Returns:
+        dict: "expected_value" and "expected_return" (% of cost) of one contract, and "prob_break_even".
+    """
+    cost = premium * 100 + commission
+    expected_value = expected_payoff * 100 - cost
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "expected_value": np.round(expected_value, 2),
+            "expected_return": np.round(expected_value / cost * 100, 2),
+            "prob_break_even": np.round(prob_break_even, 4),
+        }
+
+
+def lognormal_expectations(strike, premium, is_call, break_even, forward, vol, years, commission=0.0):
+    """
+    Expected profit and probability of finishing past break-even of every contract, in closed form.
+
+    Args:
+        strike (np.ndarray): Strike prices.
+        premium (np.ndarray): Premiums paid per share.
+        is_call (np.ndarray): True for calls, False for puts.
+        break_even (np.ndarray): Break-even prices at expiration.
+        forward (float or np.ndarray): Expected price at expiration (see lognormal_payoff).
+        vol (float or np.ndarray): Annualized volatility, per contract or shared.
+        years (float): Time to expiration in years.
+        commission (float): Commission paid per contract.
+
+    Returns:
+        dict: "expected_value" and "expected_return" (% of cost) of one contract, and "prob_break_even".
+    """
+    expected_payoff, prob_break_even = lognormal_payoff(strike, is_call, break_even, forward, vol, years)
+    return expectation_columns(expected_payoff, prob_break_even, premium, commission)
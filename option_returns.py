@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+
+from option_pricing import atm_volatility, chain_greeks, expectation_columns, lognormal_payoff, years_to_expiry
+
+
+def chain_invariants(options_data, ignore_index=True):
+    """
+    Orders a chain as calls then puts and adds the columns that do not depend on the target price.
+
+    Args:
+        options_data (pd.DataFrame): Contracts with "Type" ("Call"/"Put"), "strike", "bid" and "ask" columns.
+        ignore_index (bool): Renumber the rows instead of keeping the original index.
+
+    Returns:
+        pd.DataFrame: The calls then the puts, with "premium" (bid/ask mid) and "break_even" columns.
+    """
+    option_type = options_data["Type"].str.lower()
+    calls = options_data[option_type == "call"]
+    puts = options_data[option_type == "put"]
+    table = pd.concat([calls, puts], ignore_index=ignore_index)
+
+    is_call = np.arange(len(table)) < len(calls)
+    table["premium"] = ((table["bid"] + table["ask"]) / 2).round(2)
+    table["break_even"] = np.where(is_call, table["strike"] + table["premium"], table["strike"] - table["premium"]).round(2)
+    return table
+
+
+def option_profits(strike, premium, is_call, target_price, commission=0.0):
+    """
+    Profit and % profit at expiration of one contract (100 shares) for every option, vectorized.
+
+    Args:
+        strike (np.ndarray): Strike prices.
+        premium (np.ndarray): Premiums paid per share.
+        is_call (np.ndarray): True for calls, False for puts.
+        target_price (float or np.ndarray): Stock price at expiration; an array of shape (k, 1)
+            broadcasts to one row per target.
+        commission (float): Commission paid per contract.
+
+    Returns:
+        tuple: (profit, % profit) arrays rounded to 2 decimals.
+    """
+    cost = premium * 100 + commission
+    intrinsic = np.clip(np.where(is_call, target_price - strike, strike - target_price), 0, None)
+    profit = np.round(intrinsic * 100 - cost, 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        percent = np.round(profit / cost * 100, 2)
+    return profit, percent
+
+
+class ChainReturns:
+    """
+    Keeps a loaded chain's target-independent columns (premium, break-even, call/put masks) as
+    NumPy arrays, so evaluating a new target price or commission only costs a few array ops.
+    Given the stock price and expiration date, the implied volatility and Greeks are added as well,
+    and every evaluation also fills the lognormal expected value around the target price.
+    """
+
+    def __init__(self, options_data, stock_price=None, expiration_date=None, fallback_vol=np.nan):
+        self.table = chain_invariants(options_data)
+        self.is_call = (self.table["Type"].str.lower() == "call").to_numpy()
+        self.strike = self.table["strike"].to_numpy(dtype=float)
+        self.premium = self.table["premium"].to_numpy(dtype=float)
+        self.break_even = self.table["break_even"].to_numpy(dtype=float)
+        self.years = None
+        if stock_price is not None and expiration_date is not None:
+            self.table = self.table.join(chain_greeks(self.table, stock_price, expiration_date))
+            self.years = float(years_to_expiry(expiration_date))
+            # Contracts without an implied volatility use the at-the-money one, else `fallback_vol`
+            fallback = atm_volatility(self.table, stock_price)
+            implied = self.table["implied_vol"].to_numpy(dtype=float)
+            self.vol = np.where(np.isfinite(implied), implied, fallback if np.isfinite(fallback) else fallback_vol)
+
+    def evaluate(self, target_price, commission=0.0):
+        """
+        Fills "option_profit" and "option_percent_profit" for a target price, in place.
+
+        Contracts that do not reach their break-even at the target are left blank (NaN).
+
+        Returns:
+            pd.DataFrame: The chain table with the two profit columns updated.
+        """
+        profit, percent = option_profits(self.strike, self.premium, self.is_call, target_price, commission)
+        missed = np.where(self.is_call, self.break_even > target_price, self.break_even < target_price)
+        profit[missed] = np.nan
+        percent[missed] = np.nan
+        self.table["option_profit"] = profit
+        self.table["option_percent_profit"] = percent
+        self.add_expectations(target_price, commission)
+        return self.table
+
+    def add_expectations(self, target_price, commission=0.0):
+        """
+        Fills "expected_value", "expected_return" and "prob_break_even" for a price at expiration
+        that is lognormal around the target price, in place. Needs the stock price and expiration date.
+        """
+        if self.years is None:
+            return
+        self.set_expectations(*self.expected_payoff(target_price), commission)
+
+    def expected_payoff(self, target_price):
+        """Expected payoff per share and break-even probability around a target price (see lognormal_payoff)."""
+        return lognormal_payoff(self.strike, self.is_call, self.break_even, target_price, self.vol, self.years)
+
+    def set_expectations(self, expected_payoff, prob_break_even, commission=0.0):
+        for column, values in expectation_columns(expected_payoff, prob_break_even, self.premium, commission).items():
+            self.table[column] = values
+
+
+class ProfitGrid:
+    """
+    Payoff of every contract at every integer target price of a range, so a slider position is a row read.
+
+    Rows hold the payoff before premium and commission, so changing the commission is an adjustment
+    of the row being read rather than a rebuild. The same goes for the lognormal expectation columns,
+    when the chain has them.
+    """
+
+    def __init__(self, chain, first_target, payoff, missed, expected_payoff=None, prob_break_even=None):
+        self.chain = chain
+        self.first_target = first_target
+        self.payoff = payoff  # (targets, contracts) intrinsic value of one contract at expiration
+        self.missed = missed  # (targets, contracts) break-even not reached
+        self.expected_payoff = expected_payoff  # (targets, contracts) lognormal expected payoff per share
+        self.prob_break_even = prob_break_even  # (targets, contracts) lognormal probability past break-even
+
+    def covers(self, target_price):
+        row = target_price - self.first_target
+        return float(target_price).is_integer() and 0 <= row < len(self.payoff)
+
+    def evaluate(self, target_price, commission=0.0):
+        """Same result as ChainReturns.evaluate, read from the grid row of an integer target price."""
+        row = int(target_price) - self.first_target
+        cost = self.chain.premium * 100 + commission
+        profit = np.round(self.payoff[row] - cost, 2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            percent = np.round(profit / cost * 100, 2)
+        profit[self.missed[row]] = np.nan
+        percent[self.missed[row]] = np.nan
+        self.chain.table["option_profit"] = profit
+        self.chain.table["option_percent_profit"] = percent
+        if self.expected_payoff is not None:
+            self.chain.set_expectations(self.expected_payoff[row], self.prob_break_even[row], commission)
+        return self.chain.table
+
+
+def build_profit_grid(chain, low, high, center, max_bytes=64 * 1024 ** 2, chunk_rows=64,
+                      progress=lambda message: None, is_cancelled=lambda: False):
+    """
+    Precomputes a ProfitGrid for the integer targets low..high, in chunks so it can be cancelled.
+
+    If the full range does not fit in `max_bytes`, the rows kept are the ones closest to `center`
+    (usually the current stock price).
+
+    Args:
+        chain (ChainReturns): The loaded chain.
+        low (int): Lowest target price.
+        high (int): Highest target price.
+        center (float): Target price the kept rows are centered on when over budget.
+        max_bytes (int): Memory budget of the grid.
+        chunk_rows (int): Rows computed between cancellation checks.
+        progress (callable): Receives progress messages.
+        is_cancelled (callable): Returns True once the result is no longer wanted.
+
+    Returns:
+        ProfitGrid: The grid, or None if it was cancelled.
+    """
+    contracts = len(chain.strike)
+    rows = high - low + 1
+    # Payoff and missed rows, plus the expected payoff and break-even probability rows when priced
+    floats = 1 if chain.years is None else 3
+    bytes_per_row = max(contracts, 1) * (floats * np.dtype(float).itemsize + np.dtype(bool).itemsize)
+    if rows * bytes_per_row > max_bytes:
+        rows = max(1, max_bytes // bytes_per_row)
+        low = int(min(max(round(center) - rows // 2, low), high - rows + 1))
+
+    targets = np.arange(low, low + rows, dtype=float)[:, None]
+    payoff = np.empty((rows, contracts))
+    missed = np.empty((rows, contracts), dtype=bool)
+    expected_payoff = prob_break_even = None
+    if chain.years is not None:
+        expected_payoff = np.empty((rows, contracts))
+        prob_break_even = np.empty((rows, contracts))
+    for start in range(0, rows, chunk_rows):
+        if is_cancelled():
+            return None
+        target = targets[start:start + chunk_rows]
+        payoff[start:start + chunk_rows] = np.clip(
+            np.where(chain.is_call, target - chain.strike, chain.strike - target), 0, None) * 100
+        missed[start:start + chunk_rows] = np.where(chain.is_call, chain.break_even > target, chain.break_even < target)
+        if expected_payoff is not None:
+            expected_payoff[start:start + chunk_rows], prob_break_even[start:start + chunk_rows] = chain.expected_payoff(target)
+    progress(f"Precomputed returns for target prices ${low} to ${low + rows - 1}.")
+    return ProfitGrid(chain, low, payoff, missed, expected_payoff, prob_break_even)
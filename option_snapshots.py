@@ -0,0 +1,126 @@
+import os
+import glob
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from option_chain_cache import fetch_option_chain, flatten_chain
+
+# Root directory of the append-only snapshot store
+SNAPSHOT_DIR = "cache/option_snapshots"
+
+# Snapshot timestamps are UTC and encoded in the file names, so time windows are pruned without opening files
+SNAPSHOT_FORMAT = "%Y%m%dT%H%M%S"
+
+_PARTITIONING = ds.partitioning(pa.schema([("ticker", pa.string()), ("expiry", pa.string())]), flavor="hive")
+
+
+def snapshot_frame(chain, taken_at):
+    """
+    Flattens a full option chain into snapshot rows.
+
+    Args:
+        chain (pd.DataFrame): Chain indexed by (symbol, expiration, optionType).
+        taken_at (pd.Timestamp): When the chain was downloaded (UTC, naive).
+
+    Returns:
+        pd.DataFrame: One row per contract with "expiry" ("YYYY-MM-DD"), "Type" ("Call"/"Put") and
+            "snapshot" columns, sorted by expiry, type and strike. Numeric columns are float64.
+    """
+    rows = flatten_chain(chain)
+    # Yahoo sends volume and open interest as integers on one run and as floats with NaN on the
+    # next, so every snapshot file gets the same float64 schema
+    numeric = rows.select_dtypes("number").columns
+    rows[numeric] = rows[numeric].astype("float64")
+    rows["snapshot"] = taken_at
+    return rows.sort_values(["expiry", "Type", "strike"], ignore_index=True)
+
+
+def save_snapshot(stock_ticker, chain=None, taken_at=None, root=SNAPSHOT_DIR):
+    """
+    Appends one snapshot of every expiry of a ticker's chain to the store.
+
+    Files are laid out as ticker=<T>/expiry=<YYYY-MM-DD>/<snapshot>.parquet and compressed with
+    zstd. Existing files are never rewritten.
+
+    Args:
+        stock_ticker (str): The stock ticker symbol (e.g., "SOUN").
+        chain (pd.DataFrame): The chain to store; downloaded when not given.
+        taken_at (pd.Timestamp): Snapshot time (UTC, naive); now when not given.
+        root (str): Root directory of the store.
+
+    Returns:
+        int: Number of contracts written.
+    """
+    stock_ticker = stock_ticker.upper()
+    if chain is None:
+        chain = fetch_option_chain(stock_ticker)
+    if taken_at is None:
+        taken_at = pd.Timestamp.now(tz="UTC").tz_localize(None).floor("s")
+
+    rows = snapshot_frame(chain, taken_at)
+    name = taken_at.strftime(SNAPSHOT_FORMAT) + ".parquet"
+    for expiry, contracts in rows.groupby("expiry", sort=False):
+        directory = os.path.join(root, f"ticker={stock_ticker}", f"expiry={expiry}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, name)
+        table = pa.Table.from_pandas(contracts.drop(columns="expiry"), preserve_index=False)
+        pq.write_table(table, path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
+    return len(rows)
+
+
+def load_snapshots(stock_ticker, expiries=None, strike_range=None, start=None, end=None, columns=None,
+                   root=SNAPSHOT_DIR):
+    """
+    Reads stored snapshots of a ticker, filtered by expiry, strike range and time window.
+
+    Expiries and the time window select files by path before anything is opened; the strike range
+    is pushed down to the parquet reader.
+
+    Args:
+        stock_ticker (str): The stock ticker symbol.
+        expiries (list): "YYYY-MM-DD" expiries to read; all when None.
+        strike_range (tuple): (low, high) strikes, inclusive; None for no bound on a side.
+        start (str or pd.Timestamp): Earliest snapshot time (UTC), inclusive.
+        end (str or pd.Timestamp): Latest snapshot time (UTC), inclusive.
+        columns (list): Columns to read; all when None.
+        root (str): Root directory of the store.
+
+    Returns:
+        pd.DataFrame: The matching contracts with "ticker", "expiry" and "snapshot" columns,
+            or an empty DataFrame if nothing matches.
+    """
+    base = os.path.join(root, f"ticker={stock_ticker.upper()}")
+    expiry_dirs = [os.path.join(base, f"expiry={expiry}") for expiry in expiries] if expiries else [os.path.join(base, "*")]
+    # The file name format sorts chronologically, so the window is a string comparison
+    start = pd.Timestamp(start).strftime(SNAPSHOT_FORMAT) if start is not None else None
+    end = pd.Timestamp(end).strftime(SNAPSHOT_FORMAT) if end is not None else None
+
+    files = []
+    for expiry_dir in expiry_dirs:
+        for path in glob.glob(os.path.join(expiry_dir, "*.parquet")):
+            taken_at = os.path.basename(path)[:-len(".parquet")]
+            if (start is None or taken_at >= start) and (end is None or taken_at <= end):
+                files.append(path)
+    if not files:
+        return pd.DataFrame()
+
+    dataset = ds.dataset(sorted(files), format="parquet", partitioning=_PARTITIONING, partition_base_dir=root)
+    # The schema is inferred from the first file; integer columns (from files written before the
+    # float64 schema) are promoted so every file can be cast to it
+    schema = pa.schema([pa.field(field.name, pa.float64()) if pa.types.is_integer(field.type) else field
+                        for field in dataset.schema])
+    if schema != dataset.schema:
+        dataset = ds.dataset(sorted(files), schema=schema, format="parquet", partitioning=_PARTITIONING,
+                             partition_base_dir=root)
+    condition = None
+    if strike_range is not None:
+        low, high = strike_range
+        if low is not None:
+            condition = ds.field("strike") >= low
+        if high is not None:
+            condition = ds.field("strike") <= high if condition is None else condition & (ds.field("strike") <= high)
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
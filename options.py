@@ -1,5 +1,10 @@
 import yfinance as yf
 import pandas as pd
+import os
+import sys
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from option_snapshots import SNAPSHOT_DIR, save_snapshot
 
 def fetch_options_table(stock_ticker, expiry_date):
     """
@@ -32,41 +37,130 @@ def fetch_options_table(stock_ticker, expiry_date):
         print(f"Error fetching options data: {e}")
         return None
 
+def fetch_all_expiries(stock_ticker, max_workers=4):
+    """
+    Fetches the calls and puts of every expiry of a ticker, requesting the expiries concurrently.
+
+    Args:
+        stock_ticker (str): The stock ticker symbol (e.g., "AAPL", "SOUN").
+        max_workers (int): Expiries requested at the same time.
+
+    Returns:
+        pd.DataFrame: Every contract, with "expiry" and "Type" ("Call"/"Put") columns first.
+    """
+    expiration_dates = yf.Ticker(stock_ticker).options
+    if not expiration_dates:
+        raise ValueError(f"No options data available for {stock_ticker}.")
+
+    def fetch_expiry(expiry_date):
+        # A Ticker per request: yfinance's per-Ticker state is not safe to share between threads
+        options_chain = yf.Ticker(stock_ticker).option_chain(expiry_date)
+        # Tag with assign() and concatenate everything once at the end
+        return [options_chain.calls.assign(expiry=expiry_date, Type="Call"),
+                options_chain.puts.assign(expiry=expiry_date, Type="Put")]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        frames = [frame for pair in pool.map(fetch_expiry, expiration_dates) for frame in pair]
+    options_table = pd.concat(frames, ignore_index=True)
+    return options_table[["expiry", "Type"] + [c for c in options_table.columns if c not in ("expiry", "Type")]]
+
+
+def all_expiries_path(stock_ticker, output_dir="options"):
+    return os.path.join(output_dir, f"{stock_ticker}_options_all.parquet")
+
+
+def write_chain_file(options_table, output_file):
+    """Write one ticker's contracts as a compact parquet file (categorical expiry/Type, zstd)."""
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    options_table = options_table.astype({"expiry": "category", "Type": "category"})
+    options_table.to_parquet(output_file, index=False, compression="zstd")
+
+
+def export_all_expiries(tickers, output_dir="options", max_workers=4, expiry_workers=4):
+    """
+    Saves every expiry of every ticker to one parquet file per ticker, without any prompts.
+
+    Args:
+        tickers (list): Stock ticker symbols.
+        output_dir (str): Directory for the <TICKER>_options_all.parquet files.
+        max_workers (int): Tickers fetched at the same time.
+        expiry_workers (int): Expiries fetched at the same time for each ticker.
+
+    Returns:
+        dict: Ticker -> path of the file written, for the tickers that succeeded.
+    """
+    written = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(fetch_all_expiries, ticker, expiry_workers): ticker for ticker in tickers}
+        for future in as_completed(futures):
+            ticker = futures[future]
+            try:
+                options_table = future.result()
+            except Exception as e:
+                print(f"Error fetching options data for {ticker}: {e}")
+                continue
+            written[ticker] = all_expiries_path(ticker, output_dir)
+            write_chain_file(options_table, written[ticker])
+            print(f"Saved {len(options_table)} {ticker} contracts to {written[ticker]}")
+    return written
+
+
 if __name__ == "__main__":
-    try:
-        # Input stock ticker
-        stock_ticker = input("Enter the stock ticker (e.g., SOUN): ").strip().upper()
+    if len(sys.argv) > 1:
+        # Non-interactive modes, e.g.: python options.py --snapshot SOUN AAPL
+        #                              python options.py --all-expiries SOUN AAPL --output-dir options
+        parser = argparse.ArgumentParser(description="Save every expiry of each ticker's option chain without prompts.")
+        mode = parser.add_mutually_exclusive_group(required=True)
+        mode.add_argument("--snapshot", nargs="+", metavar="TICKER", help="Append a snapshot of these tickers to the store")
+        mode.add_argument("--all-expiries", nargs="+", metavar="TICKER", help="Export one parquet file per ticker")
+        parser.add_argument("--root", default=SNAPSHOT_DIR, help="Root directory of the snapshot store")
+        parser.add_argument("--output-dir", default="options", help="Directory of the --all-expiries files")
+        parser.add_argument("--workers", type=int, default=4, help="Tickers fetched at the same time")
+        args = parser.parse_args()
+        if args.all_expiries:
+            export_all_expiries([ticker.upper() for ticker in args.all_expiries], args.output_dir, args.workers)
+        for stock_ticker in args.snapshot or []:
+            try:
+                contracts = save_snapshot(stock_ticker, root=args.root)
+                print(f"Saved {contracts} {stock_ticker.upper()} contracts to {args.root}")
+            except Exception as e:
+                print(f"Error saving snapshot for {stock_ticker}: {e}")
+    else:
+        try:
+            # Input stock ticker
+            stock_ticker = input("Enter the stock ticker (e.g., SOUN): ").strip().upper()
         
-        # Fetch stock data
-        stock = yf.Ticker(stock_ticker)
+            # Fetch stock data
+            stock = yf.Ticker(stock_ticker)
         
-        # Get all expiration dates for the options
-        expiration_dates = stock.options
-        if not expiration_dates:
-            print("No options data available for this stock.")
-        else:
-            print("\nAvailable Expiration Dates:")
-            for i, date in enumerate(expiration_dates):
-                print(f"{i + 1}. {date}")
+            # Get all expiration dates for the options
+            expiration_dates = stock.options
+            if not expiration_dates:
+                print("No options data available for this stock.")
+            else:
+                print("\nAvailable Expiration Dates:")
+                for i, date in enumerate(expiration_dates):
+                    print(f"{i + 1}. {date}")
             
-            # Select expiration date
-            selected_index = int(input("\nSelect an expiration date by entering its number: ")) - 1
-            if selected_index < 0 or selected_index >= len(expiration_dates):
-                raise ValueError("Invalid selection. Please restart and select a valid number.")
+                # Select expiration date
+                selected_index = int(input("\nSelect an expiration date by entering its number: ")) - 1
+                if selected_index < 0 or selected_index >= len(expiration_dates):
+                    raise ValueError("Invalid selection. Please restart and select a valid number.")
             
-            expiry_date = expiration_dates[selected_index]
+                expiry_date = expiration_dates[selected_index]
             
-            # Fetch and display the options table
-            options_table = fetch_options_table(stock_ticker, expiry_date)
+                # Fetch and display the options table
+                options_table = fetch_options_table(stock_ticker, expiry_date)
             
-            if options_table is not None:
-                print("\nOptions Table:")
-                print(options_table)
+                if options_table is not None:
+                    print("\nOptions Table:")
+                    print(options_table)
                 
-                # Save to CSV
-                output_file = f"options\{stock_ticker}_options_{expiry_date}.csv"
-                options_table.to_csv(output_file, index=False)
-                print(f"\nOptions table saved to {output_file}")
+                    # Save to CSV
+                    os.makedirs("options", exist_ok=True)
+                    output_file = os.path.join("options", f"{stock_ticker}_options_{expiry_date}.csv")
+                    options_table.to_csv(output_file, index=False)
+                    print(f"\nOptions table saved to {output_file}")
     
-    except Exception as e:
-        print(f"Error: {e}")
+        except Exception as e:
+            print(f"Error: {e}")
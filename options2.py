@@ -1,6 +1,13 @@
 import yfinance as yf
 import pandas as pd
+import os
+import sys
+import argparse
 from yahooquery import Ticker
+from option_chain_cache import flatten_chain
+from options import all_expiries_path, write_chain_file
+
+OPTION_CHUNK_SIZE = 10  # Tickers per asynchronous option_chain request
 
 def fetch_options_table(stock_ticker, expiry_date):
     """
@@ -36,55 +43,100 @@ def fetch_options_table(stock_ticker, expiry_date):
         print(f"Error fetching options data: {e}")
         return None
 
+def export_all_expiries(tickers, output_dir="options", chunk_size=OPTION_CHUNK_SIZE):
+    """
+    Saves every expiry of every ticker to one parquet file per ticker, without any prompts.
+
+    yahooquery returns all expiries of a ticker in one option_chain call and, with
+    asynchronous=True, fetches the tickers of a chunk concurrently.
+
+    Args:
+        tickers (list): Stock ticker symbols.
+        output_dir (str): Directory for the <TICKER>_options_all.parquet files.
+        chunk_size (int): Tickers per request.
+
+    Returns:
+        dict: Ticker -> path of the file written, for the tickers that succeeded.
+    """
+    written = {}
+    for start in range(0, len(tickers), chunk_size):
+        chunk = tickers[start:start + chunk_size]
+        try:
+            chains = Ticker(chunk, asynchronous=True).option_chain
+            # yahooquery returns a message string instead of a DataFrame when there is no chain
+            if not isinstance(chains, pd.DataFrame):
+                raise ValueError(chains)
+        except Exception as e:
+            print(f"Error fetching options data for {', '.join(chunk)}: {e}")
+            continue
+
+        for stock_ticker, chain in chains.groupby(level="symbol", sort=False):
+            written[stock_ticker] = all_expiries_path(stock_ticker, output_dir)
+            write_chain_file(flatten_chain(chain), written[stock_ticker])
+            print(f"Saved {len(chain)} {stock_ticker} contracts to {written[stock_ticker]}")
+        for stock_ticker in chunk:
+            if stock_ticker not in written:
+                print(f"No options data available for {stock_ticker}.")
+    return written
+
 if __name__ == "__main__":
-    try:
-        # Input stock ticker
-        stock_ticker = input("Enter the stock ticker (e.g., SOUN): ").strip().upper()
+    if len(sys.argv) > 1:
+        # Bulk mode, e.g.: python options2.py SOUN AAPL MSFT --output-dir options
+        parser = argparse.ArgumentParser(description="Save every expiry of each ticker's option chain to one parquet file per ticker.")
+        parser.add_argument("tickers", nargs="+", help="Stock ticker symbols")
+        parser.add_argument("--output-dir", default="options", help="Directory of the output files")
+        args = parser.parse_args()
+        export_all_expiries([ticker.upper() for ticker in args.tickers], args.output_dir)
+    else:
+        try:
+            # Input stock ticker
+            stock_ticker = input("Enter the stock ticker (e.g., SOUN): ").strip().upper()
         
-        # Fetch stock data
-        stock = Ticker(stock_ticker)
-        options = stock.option_chain
-        # print(options.loc[stock_ticker,'2025-10-17'])
-        # print(stock)
+            # Fetch stock data
+            stock = Ticker(stock_ticker)
+            options = stock.option_chain
+            # print(options.loc[stock_ticker,'2025-10-17'])
+            # print(stock)
         
-        # Get all expiration dates for the options
-        option_table = options.index.format()
-        # print(option_table[0].strip(stock_ticker).strip().strip('calls').strip('puts'))
-        i=0
-        date_table = []
-        if not option_table:
-            print("No options data available for this stock.")
-        else:
-            print("\nAvailable Expiration Dates:")
-            for date in (option_table):
-                trim = date.strip(stock_ticker).strip().strip('calls').strip('puts').strip()
-                if trim != '':
-                    date_table.append(trim)
-                    print(f"{i}. {trim}")
-                    i += 1
-            # print(date_table)
+            # Get all expiration dates for the options
+            option_table = options.index.format()
+            # print(option_table[0].strip(stock_ticker).strip().strip('calls').strip('puts'))
+            i=0
+            date_table = []
+            if not option_table:
+                print("No options data available for this stock.")
+            else:
+                print("\nAvailable Expiration Dates:")
+                for date in (option_table):
+                    trim = date.strip(stock_ticker).strip().strip('calls').strip('puts').strip()
+                    if trim != '':
+                        date_table.append(trim)
+                        print(f"{i}. {trim}")
+                        i += 1
+                # print(date_table)
             
-            # Select expiration date
-            selected_index = int(input("\nSelect an expiration date by entering its number: ")) - 1
-            if selected_index < 0 or selected_index >= len(option_table):
-                raise ValueError("Invalid selection. Please restart and select a valid number.")
+                # Select expiration date
+                selected_index = int(input("\nSelect an expiration date by entering its number: ")) - 1
+                if selected_index < 0 or selected_index >= len(option_table):
+                    raise ValueError("Invalid selection. Please restart and select a valid number.")
             
-            expiry_date = date_table[selected_index]
-            # print(expiry_date)
-            # print(options.loc[stock_ticker,expiry_date])
-            # print('ok')
+                expiry_date = date_table[selected_index]
+                # print(expiry_date)
+                # print(options.loc[stock_ticker,expiry_date])
+                # print('ok')
             
-            # Fetch and display the options table
-            options_table = fetch_options_table(stock_ticker, expiry_date)
+                # Fetch and display the options table
+                options_table = fetch_options_table(stock_ticker, expiry_date)
             
-            if options_table is not None:
-                print("\nOptions Table:")
-                print(options_table)
+                if options_table is not None:
+                    print("\nOptions Table:")
+                    print(options_table)
                 
-                # Save to CSV
-                output_file = f"options\{stock_ticker}_options_{expiry_date}.csv"
-                options_table.to_csv(output_file, index=False)
-                print(f"\nOptions table saved to {output_file}")
+                    # Save to CSV
+                    os.makedirs("options", exist_ok=True)
+                    output_file = os.path.join("options", f"{stock_ticker}_options_{expiry_date}.csv")
+                    options_table.to_csv(output_file, index=False)
+                    print(f"\nOptions table saved to {output_file}")
     
-    except Exception as e:
-        print(f"Error: {e}")
+        except Exception as e:
+            print(f"Error: {e}")
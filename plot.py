@@ -1,36 +1,35 @@
 import yfinance as yf
-import matplotlib.pyplot as plt
 import pandas as pd
 import os
+from bar_cache import fetch_many
+from render_pool import render_pool, plot_lines, wait_for_charts
 
-def fetch_and_plot_data(start_date, end_date, tickers):
+def fetch_and_plot_data(start_date, end_date, tickers, max_workers=8, render_workers=None):
     os.makedirs("plots", exist_ok=True)
 
-    stock_data = {}
-    for ticker in tickers:
-        stock_data[ticker] = yf.download(ticker, start=start_date, end=end_date)
+    # Download tickers concurrently and hand each one to the rendering pool as soon as it arrives
+    with render_pool(render_workers) as pool:
+        charts = []
+        for ticker, data in fetch_many(tickers, max_workers=max_workers, start=start_date, end=end_date):
+            if not data.empty:
+                charts.append(pool.submit(
+                    plot_lines,
+                    f"plots/{ticker}_stock_price_{start_date}_to_{end_date}.png",
+                    [(data.index, data['Close'].to_numpy(), ticker, None)],
+                    f'Stock Price for {ticker}', 'Date', 'Closing Price (USD)',
+                ))
+            else:
+                print(f"No data found for ticker {ticker}")
+        wait_for_charts(charts)
 
-    for ticker, data in stock_data.items():
-        if not data.empty:
-            plt.figure(figsize=(10, 5))
-            plt.plot(data.index, data['Close'], label=ticker)
-            plt.title(f'Stock Price for {ticker}')
-            plt.xlabel('Date')
-            plt.ylabel('Closing Price (USD)')
-            plt.legend()
-            plt.grid()
-            plt.savefig(f"plots/{ticker}_stock_price_{start_date}_to_{end_date}.png")
-            plt.close()
-        else:
-            print(f"No data found for ticker {ticker}")
+if __name__ == "__main__":
+    start_date = input("Enter the starting date (YYYY-MM-DD): ")
+    end_date = input("Enter the ending date (YYYY-MM-DD): ")
+    tickers = input("Enter the stock symbols separated by commas (ex: GOOGL,TSLA): ").strip()
+    if not tickers:
+        tickers = ["SOUN", "SOUNW", "NVDA", "PLTR", "AI", "GOOGL", "TSLA"]
+    else:
+        tickers = [symbol.strip() for symbol in tickers.split(",")]
 
-start_date = input("Enter the starting date (YYYY-MM-DD): ")
-end_date = input("Enter the ending date (YYYY-MM-DD): ")
-tickers = input("Enter the stock symbols separated by commas (ex: GOOGL,TSLA): ").strip()
-if not tickers:
-    tickers = ["SOUN", "SOUNW", "NVDA", "PLTR", "AI", "GOOGL", "TSLA"]
-else:
-    tickers = [symbol.strip() for symbol in tickers.split(",")]
-
-# Fetch and plot the data
-fetch_and_plot_data(start_date, end_date, tickers)
+    # Fetch and plot the data
+    fetch_and_plot_data(start_date, end_date, tickers)
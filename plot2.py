@@ -1,88 +1,101 @@
 import yfinance as yf
-import matplotlib.pyplot as plt
 import pandas as pd
+import numpy as np
 import os
+from bar_cache import fetch_many
+from render_pool import render_pool, plot_lines, wait_for_charts
+
+# Regular session bounds in US/Eastern time, both inclusive like DataFrame.between_time("09:30", "16:00")
+REGULAR_OPEN = pd.Timedelta(hours=9, minutes=30)
+REGULAR_CLOSE = pd.Timedelta(hours=16)
+SESSIONS = ["pre", "regular", "post"]
+
+def label_sessions(index):
+    """Label each bar of a US/Eastern DatetimeIndex as pre, regular or post market."""
+    time_of_day = index - index.normalize()
+    codes = np.ones(len(index), dtype=np.int8)
+    codes[time_of_day < REGULAR_OPEN] = 0
+    codes[time_of_day > REGULAR_CLOSE] = 2
+    return pd.Categorical.from_codes(codes, SESSIONS)
 
 def calculate_percentage_changes(data):
-    """Calculate day and aftermarket percentage changes."""
-    # Regular hours: 9:30 AM to 4:00 PM
-    regular_hours = data.between_time("09:30", "16:00")
+    """
+    Calculate day and aftermarket percentage changes for every day of the data in one pass.
 
-    # Calculate day percentage change
-    if not regular_hours.empty:
-        day_open_price = regular_hours.iloc[0]['Open']
-        day_close_price = regular_hours.iloc[-1]['Close']
-        day_change_percent = ((day_close_price - day_open_price) / day_open_price) * 100
-    else:
-        day_change_percent = None
+    Args:
+        data (pd.DataFrame): Intraday bars indexed in US/Eastern time, with Open/Close columns,
+            or (Price, Ticker) columns to process several tickers at once.
 
-    # Calculate aftermarket percentage change
-    if not regular_hours.empty:
-        regular_close_price = regular_hours.iloc[-1]['Close']
-        overall_close_price = data['Close'].iloc[-1]
-        aftermarket_change_percent = ((overall_close_price - regular_close_price) / regular_close_price) * 100
+    Returns:
+        pd.DataFrame: One row per day with a regular session (indexed by Date, or Ticker and Date),
+            with the day open, regular close, last print, day % change and aftermarket % change.
+    """
+    if isinstance(data.columns, pd.MultiIndex):
+        bars = data.stack(level="Ticker", future_stack=True).dropna(how="all").reset_index(level="Ticker")
+        keys = ["Ticker", "Date"]
     else:
-        aftermarket_change_percent = None
+        bars = data
+        keys = ["Date"]
+    bars = bars.assign(Date=bars.index.normalize().tz_localize(None), Session=label_sessions(bars.index))
 
-    return day_change_percent, aftermarket_change_percent
+    # Days without regular session bars are skipped
+    regular = bars[bars["Session"] == "regular"].groupby(keys)
+    changes = pd.DataFrame({
+        "open": regular["Open"].first(skipna=False),
+        "regular_close": regular["Close"].last(skipna=False),
+    })
+    changes["last"] = bars.groupby(keys)["Close"].last(skipna=False).reindex(changes.index)
+    changes["day_change"] = (changes["regular_close"] - changes["open"]) / changes["open"] * 100
+    changes["aftermarket_change"] = (changes["last"] - changes["regular_close"]) / changes["regular_close"] * 100
+    return changes
 
-def fetch_and_plot_data(start_date, end_date, tickers):
+def fetch_and_plot_data(start_date, end_date, tickers, max_workers=8, render_workers=None):
     os.makedirs("plots", exist_ok=True)
 
-    stock_data = {}
-    for ticker in tickers:
-        # Fetch stock data with extended hours
-        stock_data[ticker] = yf.download(ticker, start=start_date, end=end_date, interval="1h", prepost=True)
+    with render_pool(render_workers) as pool:
+        charts = []
+        # Fetch stock data with extended hours concurrently, plotting each ticker as it arrives
+        for ticker, data in fetch_many(tickers, max_workers=max_workers, start=start_date, end=end_date,
+                                       interval="1h", prepost=True):
+            if not data.empty:
+                # Convert index to EST
+                # data.index = data.index.tz_localize("UTC").tz_convert("US/Eastern")
+                data.index = data.index.tz_convert("US/Eastern")
 
-    for ticker, data in stock_data.items():
-        if not data.empty:
-            # Convert index to EST
-            # data.index = data.index.tz_localize("UTC").tz_convert("US/Eastern")
-            data.index = data.index.tz_convert("US/Eastern")
+                # print(data)
 
-            # print(data)
+                # Calculate percentage changes over time
+                changes = calculate_percentage_changes(data).loc[ticker]
+                dates = changes.index
+                day_changes = changes["day_change"].to_numpy()
+                aftermarket_changes = changes["aftermarket_change"].to_numpy()
 
-            # Calculate percentage changes over time
-            day_changes = []
-            aftermarket_changes = []
-            dates = []
+                # Plot and save in the rendering pool
+                charts.append(pool.submit(
+                    plot_lines,
+                    f"plots/{ticker}_percentage_changes_{start_date}_to_{end_date}.png",
+                    [(dates, day_changes, 'Day % Change', 'blue'),
+                     (dates, aftermarket_changes, 'Aftermarket % Change', 'orange')],
+                    f'Percentage Changes for {ticker}', 'Date', '% Change', figsize=(12, 6),
+                ))
+            else:
+                print(f"No data found for ticker {ticker}")
+        wait_for_charts(charts)
 
-            for date, group in data.groupby(data.index.date):
-                day_change, aftermarket_change = calculate_percentage_changes(group)
-                if day_change is not None and aftermarket_change is not None:
-                    day_changes.append(day_change)
-                    aftermarket_changes.append(aftermarket_change)
-                    dates.append(date)
-            
-            # Plotting
-            plt.figure(figsize=(12, 6))
-            plt.plot(dates, day_changes, label='Day % Change', color='blue')
-            plt.plot(dates, aftermarket_changes, label='Aftermarket % Change', color='orange')
-            plt.title(f'Percentage Changes for {ticker}')
-            plt.xlabel('Date')
-            plt.ylabel('% Change')
-            plt.legend()
-            plt.grid()
+if __name__ == "__main__":
+    start_date = input("Enter the starting date (YYYY-MM-DD): ")
+    if not start_date:
+        start_date = "2024-12-01"
 
-            # Save the plot
-            plt.savefig(f"plots/{ticker}_percentage_changes_{start_date}_to_{end_date}.png")
-            plt.close()
-        else:
-            print(f"No data found for ticker {ticker}")
+    end_date = input("Enter the ending date (YYYY-MM-DD): ")
+    if not end_date:
+        end_date = "2024-12-31"
 
-start_date = input("Enter the starting date (YYYY-MM-DD): ")
-if not start_date:
-    start_date = "2024-12-01"
-
-end_date = input("Enter the ending date (YYYY-MM-DD): ")
-if not end_date:
-    end_date = "2024-12-31"
-
-tickers = input("Enter the stock symbols separated by commas (ex: GOOGL,TSLA): ").strip()
-if not tickers:
-    tickers = ["SOUN", "SOUNW", "NVDA", "PLTR", "AI", "GOOGL", "TSLA"]
-else:
-    tickers = [symbol.strip() for symbol in tickers.split(",")]
+    tickers = input("Enter the stock symbols separated by commas (ex: GOOGL,TSLA): ").strip()
+    if not tickers:
+        tickers = ["SOUN", "SOUNW", "NVDA", "PLTR", "AI", "GOOGL", "TSLA"]
+    else:
+        tickers = [symbol.strip() for symbol in tickers.split(",")]
 
-# Fetch and plot the data
-fetch_and_plot_data(start_date, end_date, tickers)
+    # Fetch and plot the data
+    fetch_and_plot_data(start_date, end_date, tickers)
@@ -0,0 +1,107 @@
+import multiprocessing
+
+import matplotlib
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def _use_headless_backend():
+    """Switch a worker process to the non-interactive Agg backend."""
+    matplotlib.use("Agg")
+
+
+def render_pool(max_workers=None):
+    """
+    Creates a process pool that renders charts to PNG files without a display.
+
+    Submit `plot_lines` / `plot_histogram` calls to it and pass the futures to
+    `wait_for_charts`. Scripts using it must keep their top-level code under
+    `if __name__ == "__main__":` so worker processes can import them safely.
+
+    Workers are spawned rather than forked: the callers' download threads may still hold locks
+    when the first chart is submitted, and a forked child would inherit them locked.
+
+    Args:
+        max_workers (int): Number of rendering processes (defaults to the CPU count).
+
+    Returns:
+        ProcessPoolExecutor: The pool, usable as a context manager.
+    """
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_use_headless_backend)
+
+
+def wait_for_charts(futures):
+    """Wait for submitted charts, report failures, and return the files written."""
+    written = []
+    for future in as_completed(futures):
+        try:
+            written.append(future.result())
+        except Exception as e:
+            print(f"Error rendering chart: {e}")
+    return written
+
+
+def plot_lines(output_file, lines, title, xlabel, ylabel, figsize=(10, 5), show=False):
+    """
+    Plots one or more lines and saves the figure.
+
+    Args:
+        output_file (str): Path of the PNG file to write.
+        lines (list): (x, y, label, color) tuples, color may be None.
+        title (str): Figure title.
+        xlabel (str): X axis label.
+        ylabel (str): Y axis label.
+        figsize (tuple): Figure size in inches.
+        show (bool): Show the figure interactively after saving it.
+
+    Returns:
+        str: The path of the saved file.
+    """
+    plt.figure(figsize=figsize)
+    for x, y, label, color in lines:
+        plt.plot(x, y, label=label, color=color)
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.legend()
+    plt.grid()
+    plt.savefig(output_file)
+    if show:
+        plt.show()
+    plt.close()
+    return output_file
+
+
+def plot_histogram(output_file, values, title, xlabel, ylabel, bins=50, threshold=None, figsize=(12, 6), show=False):
+    """
+    Plots a histogram, optionally with a dashed threshold line, and saves the figure.
+
+    Args:
+        output_file (str): Path of the PNG file to write.
+        values (array-like): The values to bin.
+        title (str): Figure title.
+        xlabel (str): X axis label.
+        ylabel (str): Y axis label.
+        bins (int): Number of histogram bins.
+        threshold (float): Draws a red dashed line at this value when given.
+        figsize (tuple): Figure size in inches.
+        show (bool): Show the figure interactively after saving it.
+
+    Returns:
+        str: The path of the saved file.
+    """
+    plt.figure(figsize=figsize)
+    plt.hist(values, bins=bins, alpha=0.75)
+    if threshold is not None:
+        plt.axvline(threshold, color='r', linestyle='--', label=f'Threshold: {threshold}%')
+    plt.title(title)
+    plt.xlabel(xlabel)
+    plt.ylabel(ylabel)
+    plt.legend()
+    plt.grid()
+    plt.savefig(output_file)
+    if show:
+        plt.show()
+    plt.close()
+    return output_file
@@ -2,23 +2,40 @@ import pandas as pd
 import datetime
 import yfinance as yf
 import os
+import sys
+import glob
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from option_returns import chain_invariants, option_profits
+from monte_carlo import historical_log_returns, realized_volatility
+from option_pricing import GREEK_COLUMNS, atm_volatility, chain_greeks, lognormal_expectations, years_to_expiry
 
 pd.set_option('display.max_columns', None)  # Show all columns
 pd.set_option('display.width', 1000)       # Adjust display width for better console output
 pd.set_option('display.max_rows', 100)     # Show more rows if needed
 pd.set_option('display.float_format', '{:.2f}'.format)  # Limit floats to 2 decimal places globally
 
-def calculate_profit(csv_file, price_target, stock_price):
+def calculate_profit(csv_file, price_target, stock_price, expiration_date=None, fallback_vol=np.nan):
     """
     Reads a CSV file of options, calculates profit and % profit for both calls and puts.
 
     Args:
         csv_file (str): The path to the CSV file containing the options data.
-        price_target (float): The target stock price at expiration.
+        price_target (float or array-like): The target stock price at expiration, or several
+            targets to sweep in one broadcasted computation.
         stock_price (float): The current stock price.
+        expiration_date (str): The expiration date in "YYYY-MM-DD" format; read from the file
+            name (e.g., SOUN_options_2025-07-18.csv) when not given. Without a valid date, the
+            volatility, Greek and expectation columns are NaN.
+        fallback_vol (float): Volatility of the expectation columns when the chain has no implied
+            volatility at all (e.g., a stale chain), such as the ticker's realized volatility.
 
     Returns:
-        pd.DataFrame: A DataFrame with additional columns for profit and % profit.
+        pd.DataFrame: A DataFrame with additional columns for implied volatility, Greeks, profit,
+            % profit, and the expected value and break-even probability of a price at expiration
+            lognormal around the target. For several targets, one block of rows per target with a leading
+            "price_target" column.
     """
     try:
         # Load the options data
@@ -30,70 +47,190 @@ def calculate_profit(csv_file, price_target, stock_price):
             if column not in options_data.columns:
                 raise ValueError(f"Missing required column: {column}")
 
-        # Calculate the mid-price of the option (average of bid and ask)
-        options_data["premium"] = ((options_data["bid"] + options_data["ask"]) / 2).round(2)
-        
-        # Initialize profit and percent profit columns
-        options_data["break_even"] = 0.0
-        options_data["option_profit"] = 0.0
-        options_data["option_percent_profit"] = 0.0
-
-        # Process calls
-        calls = options_data[options_data["Type"].str.lower() == "call"].copy()
-        calls["break_even"] = (calls["strike"] + calls["premium"]).round(2)
-        calls["option_profit"] = (
-            ((price_target - calls["strike"]).clip(lower=0) * 100 - calls["premium"] * 100).round(2)
-        )
-        calls["option_percent_profit"] = (
-            (calls["option_profit"] / (calls["premium"] * 100) * 100).round(2)
+        # Calls then puts, with the mid-price premium and break-even of each contract
+        combined_data = chain_invariants(options_data, ignore_index=False)
+        is_call = (combined_data["Type"].str.lower() == "call").to_numpy()
+
+        # (targets x contracts) profits in one broadcasted computation
+        targets = np.atleast_1d(np.asarray(price_target, dtype=float))
+        option_profit, option_percent_profit = option_profits(
+            combined_data["strike"].to_numpy(dtype=float),
+            combined_data["premium"].to_numpy(dtype=float),
+            is_call,
+            targets[:, None],
         )
 
-        # Process puts
-        puts = options_data[options_data["Type"].str.lower() == "put"].copy()
-        puts["break_even"] = (puts["strike"] - puts["premium"]).round(2)
-        puts["option_profit"] = (
-            ((puts["strike"] - price_target).clip(lower=0) * 100 - puts["premium"] * 100).round(2)
-        )
-        puts["option_percent_profit"] = (
-            (puts["option_profit"] / (puts["premium"] * 100) * 100).round(2)
-        )
-
-        # Combine calls and puts
-        combined_data = pd.concat([calls, puts])
-
         # Filter relevant columns
-        relevant_columns = [
-            "Type", "strike", "premium", "break_even", 
-            "option_profit", "option_percent_profit"
-        ]
+        relevant_columns = ["Type", "strike", "premium", "break_even"]
         filtered_data = combined_data[relevant_columns]
 
-        return filtered_data
+        # Implied volatility and Greeks from the mid price, solved once whatever the number of targets
+        if expiration_date is None:
+            expiration_date = chain_file_info(csv_file)[1]
+        try:
+            years = float(years_to_expiry(expiration_date))
+        except ValueError:
+            # e.g., a file name without a date: the profits do not need one
+            years = np.nan
+        if np.isnan(years):
+            filtered_data = filtered_data.assign(**{column: np.nan for column in GREEK_COLUMNS})
+        else:
+            filtered_data = filtered_data.join(chain_greeks(combined_data, stock_price, expiration_date))
+
+        # Contracts without an implied volatility use the at-the-money one, else `fallback_vol`
+        implied = filtered_data["implied_vol"].to_numpy(dtype=float)
+        fallback = atm_volatility(filtered_data, stock_price)
+        vol = np.where(np.isfinite(implied), implied, fallback if np.isfinite(fallback) else fallback_vol)
+        expectations = lognormal_expectations(
+            filtered_data["strike"].to_numpy(dtype=float),
+            filtered_data["premium"].to_numpy(dtype=float),
+            is_call,
+            filtered_data["break_even"].to_numpy(dtype=float),
+            targets[:, None],
+            vol,
+            years,
+        )
+
+        if np.ndim(price_target) == 0:
+            return filtered_data.assign(option_profit=option_profit[0], option_percent_profit=option_percent_profit[0],
+                                        **{column: values[0] for column, values in expectations.items()})
+
+        # Long format: the contracts repeated once per target
+        sweep_data = filtered_data.iloc[np.tile(np.arange(len(filtered_data)), len(targets))]
+        sweep_data = sweep_data.assign(option_profit=option_profit.ravel(), option_percent_profit=option_percent_profit.ravel(),
+                                       **{column: values.ravel() for column, values in expectations.items()})
+        sweep_data.insert(0, "price_target", np.repeat(targets, len(filtered_data)))
+        return sweep_data
 
     except Exception as e:
         print(f"Error: {e}")
         return None
 
-if __name__ == "__main__":
-    csv_file = input("Enter the path to the options CSV file (e.g., options/SOUN_options_2025-07-18.csv): ")
-    price_target = float(input("Enter your price target at expiration: "))
+def parse_price_targets(text):
+    """
+    Parses price targets typed as "30", "24,29,30" or a "low:high:step" range such as "20:40:0.5".
+
+    Returns:
+        float or np.ndarray: One target, or an array of targets for a sweep.
+    """
+    if ":" in text:
+        low, high, step = (float(part) for part in text.split(":"))
+        # Include the upper bound when the step lands on it
+        return np.arange(low, high + step / 2, step)
+    targets = [float(part) for part in text.split(",") if part.strip()]
+    return targets[0] if len(targets) == 1 else np.array(targets)
+
+def chain_file_info(csv_file):
+    """Return the ticker and expiration date of a chain file named like SOUN_options_2025-07-18.csv."""
+    name = os.path.splitext(os.path.basename(csv_file))[0]
+    return name.split("_")[0].upper(), name.split("_")[-1]
+
+def fetch_stock_price(stock_ticker):
+    """Latest close of a ticker, or NaN if it cannot be fetched."""
+    try:
+        return yf.Ticker(stock_ticker).history(period="1d")["Close"].iloc[-1]
+    except Exception as e:
+        print(f"Error fetching the stock price of {stock_ticker}: {e}")
+        return np.nan
 
+def fetch_realized_volatility(stock_ticker):
+    """Annualized volatility of a ticker's cached daily bars, or NaN if they cannot be fetched."""
     try:
-        expiration_date = csv_file.split("_")[-1].split(".")[0]
-    except IndexError:
-        raise ValueError("CSV file name does not follow the expected format (e.g., SOUN_options_2025-07-18.csv).")
+        return realized_volatility(historical_log_returns(stock_ticker))
+    except Exception as e:
+        print(f"Error fetching the price history of {stock_ticker}: {e}")
+        return np.nan
+
+def profit_for_file(csv_file, price_targets, stock_price, fallback_vol=np.nan):
+    """Runs calculate_profit on one chain file and tags the rows with its ticker and expiration."""
+    profits = calculate_profit(csv_file, price_targets, stock_price, fallback_vol=fallback_vol)
+    if profits is None:
+        return None
+    stock_ticker, expiration_date = chain_file_info(csv_file)
+    profits.insert(0, "stock_price", stock_price)
+    profits.insert(0, "expiration", expiration_date)
+    profits.insert(0, "ticker", stock_ticker)
+    return profits
+
+def calculate_profit_batch(pattern, price_targets, output_file, max_workers=None):
+    """
+    Prices every chain file matching a glob across a process pool and writes one parquet file.
 
-    stock_ticker = os.path.basename(csv_file).split("_")[0].upper()
-    stock = yf.Ticker(stock_ticker)
-    stock_price = stock.history(period="1d")["Close"].iloc[-1]
-    print(f"Current stock price: {stock_price:.2f}")
+    Args:
+        pattern (str): Glob of chain CSV files (e.g., "options/*.csv").
+        price_targets (float or array-like): Target price(s) at expiration evaluated for every file.
+        output_file (str): Path of the consolidated parquet file.
+        max_workers (int): Number of worker processes (defaults to the CPU count).
 
-    options_data_with_profits = calculate_profit(csv_file, price_target, stock_price)
+    Returns:
+        pd.DataFrame: The consolidated results, or None if no file could be priced.
+    """
+    csv_files = sorted(glob.glob(pattern))
+    if not csv_files:
+        print(f"No files match {pattern}")
+        return None
+    price_targets = np.atleast_1d(np.asarray(price_targets, dtype=float))
+
+    # One spot price and realized volatility per underlying, not per file
+    stock_tickers = sorted({chain_file_info(csv_file)[0] for csv_file in csv_files})
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        stock_prices = dict(zip(stock_tickers, executor.map(fetch_stock_price, stock_tickers)))
+        realized_vols = dict(zip(stock_tickers, executor.map(fetch_realized_volatility, stock_tickers)))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(
+            profit_for_file,
+            csv_files,
+            [price_targets] * len(csv_files),
+            [stock_prices[chain_file_info(csv_file)[0]] for csv_file in csv_files],
+            [realized_vols[chain_file_info(csv_file)[0]] for csv_file in csv_files],
+        )
+        results = [profits for profits in results if profits is not None]
 
-    if options_data_with_profits is not None:
-        print("\nOptions Data with Profit Calculations:")
-        print(options_data_with_profits)
+    if not results:
+        print("None of the files could be priced.")
+        return None
+    combined_data = pd.concat(results, ignore_index=True)
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    combined_data.to_parquet(output_file, index=False)
+    print(f"Priced {len(results)} of {len(csv_files)} files, results saved to {output_file}")
+    return combined_data
 
-        output_file = f"return/{stock_ticker}_profit_{expiration_date}_{int(price_target)}.csv"
-        options_data_with_profits.to_csv(output_file, index=False)
-        print(f"\nFiltered results saved to {output_file}")
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Batch mode, e.g.: python returns.py "options/*.csv" 20:40:0.5 --output return/batch_profit.parquet
+        parser = argparse.ArgumentParser(description="Price every options CSV matching a glob at one or more targets.")
+        parser.add_argument("pattern", help='Glob of options CSV files, e.g. "options/*.csv"')
+        parser.add_argument("targets", help="Price targets: 30, 24,29,30 or low:high:step")
+        parser.add_argument("--output", default="return/batch_profit.parquet", help="Consolidated parquet output")
+        parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+        args = parser.parse_args()
+        calculate_profit_batch(args.pattern, parse_price_targets(args.targets), args.output, args.workers)
+    else:
+        csv_file = input("Enter the path to the options CSV file (e.g., options/SOUN_options_2025-07-18.csv): ")
+        price_target = parse_price_targets(input("Enter your price target(s) at expiration (e.g., 30, 24,29,30 or 20:40:0.5): "))
+
+        try:
+            expiration_date = csv_file.split("_")[-1].split(".")[0]
+        except IndexError:
+            raise ValueError("CSV file name does not follow the expected format (e.g., SOUN_options_2025-07-18.csv).")
+
+        stock_ticker = os.path.basename(csv_file).split("_")[0].upper()
+        stock = yf.Ticker(stock_ticker)
+        stock_price = stock.history(period="1d")["Close"].iloc[-1]
+        print(f"Current stock price: {stock_price:.2f}")
+
+        options_data_with_profits = calculate_profit(csv_file, price_target, stock_price,
+                                                     fallback_vol=fetch_realized_volatility(stock_ticker))
+
+        if options_data_with_profits is not None:
+            print("\nOptions Data with Profit Calculations:")
+            print(options_data_with_profits)
+
+            if np.ndim(price_target) == 0:
+                output_file = f"return/{stock_ticker}_profit_{expiration_date}_{int(price_target)}.csv"
+            else:
+                output_file = f"return/{stock_ticker}_profit_{expiration_date}_{int(price_target.min())}-{int(price_target.max())}.csv"
+            os.makedirs("return", exist_ok=True)
+            options_data_with_profits.to_csv(output_file, index=False)
+            print(f"\nFiltered results saved to {output_file}")
@@ -0,0 +1,137 @@
+import os
+import heapq
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from option_chain_cache import OptionChainCache, flatten_chain
+from option_returns import chain_invariants, option_profits
+from returns import fetch_stock_price
+
+# Columns of the contracts kept in the ranking
+RESULT_COLUMNS = ["expiry", "Type", "contractSymbol", "strike", "bid", "ask", "premium", "break_even"]
+
+
+def chain_returns_at_move(chain, stock_price, move, commission=0.0):
+    """
+    Profit of every contract of every expiry of one chain if the stock moves by `move` by expiration.
+
+    Args:
+        chain (pd.DataFrame): Chain indexed by (symbol, expiration, optionType).
+        stock_price (float): The current stock price.
+        move (float): Relative move at expiration (e.g., 0.15 for +15%, -0.1 for -10%).
+        commission (float): Commission paid per contract.
+
+    Returns:
+        tuple: (contracts table, profit array, % profit array)
+    """
+    table = chain_invariants(flatten_chain(chain))
+    is_call = (table["Type"] == "Call").to_numpy()
+    profit, percent = option_profits(
+        table["strike"].to_numpy(dtype=float),
+        table["premium"].to_numpy(dtype=float),
+        is_call,
+        stock_price * (1 + move),
+        commission,
+    )
+    return table, profit, percent
+
+
+def scan_options(tickers, move=0.15, top_k=20, commission=0.0, cache=None, max_workers=8):
+    """
+    Ranks the contracts of a whole universe by % profit at a target move.
+
+    Chains and spot prices are fetched concurrently (chains through an OptionChainCache, so
+    repeated scans reuse them). Each ticker's contracts are priced in one vectorized pass and
+    only its best `top_k` enter a bounded heap, so no table of every contract is ever built.
+
+    Args:
+        tickers (list): Stock ticker symbols.
+        move (float): Relative move at expiration (e.g., 0.15 for +15%).
+        top_k (int): Number of contracts to return.
+        commission (float): Commission paid per contract.
+        cache (OptionChainCache): Chain cache to read from; a new one when not given.
+        max_workers (int): Tickers fetched at the same time.
+
+    Returns:
+        pd.DataFrame: The top contracts, best first, with ticker, spot, target and profit columns.
+    """
+    if top_k < 1:
+        raise ValueError(f"top_k must be at least 1, got {top_k}")
+    cache = cache or OptionChainCache()
+    heap = []  # min-heap of (% profit, sequence, row) holding the best contracts so far
+    sequence = 0
+
+    def fetch(stock_ticker):
+        return cache.get(stock_ticker), fetch_stock_price(stock_ticker)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fetch, stock_ticker): stock_ticker for stock_ticker in tickers}
+        for future in as_completed(futures):
+            stock_ticker = futures[future]
+            try:
+                chain, stock_price = future.result()
+                table, profit, percent = chain_returns_at_move(chain, stock_price, move, commission)
+            except Exception as e:
+                print(f"Error scanning {stock_ticker}: {e}")
+                continue
+
+            # Contracts without a quote have no cost, so no meaningful % profit
+            candidates = np.flatnonzero(np.isfinite(percent) & (table["premium"].to_numpy() > 0))
+            if len(candidates) > top_k:
+                candidates = candidates[np.argpartition(percent[candidates], -top_k)[-top_k:]]
+            if len(candidates) == 0:
+                continue
+
+            columns = [column for column in RESULT_COLUMNS if column in table.columns]
+            values = table[columns].to_numpy()
+            for i in candidates:
+                if len(heap) == top_k and percent[i] <= heap[0][0]:
+                    continue
+                row = dict(zip(columns, values[i]))
+                row.update(ticker=stock_ticker, stock_price=stock_price, target_price=stock_price * (1 + move),
+                           option_profit=profit[i], option_percent_profit=percent[i])
+                entry = (percent[i], sequence, row)
+                sequence += 1
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                else:
+                    heapq.heapreplace(heap, entry)
+
+    ranked = [row for _, _, row in sorted(heap, key=lambda entry: (-entry[0], entry[1]))]
+    result = pd.DataFrame(ranked)
+    if not result.empty:
+        result = result[["ticker", "stock_price", "target_price"] + [c for c in result.columns if c not in ("ticker", "stock_price", "target_price")]]
+    return result
+
+
+def positive_int(text):
+    """argparse type for counts that must be at least 1."""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+if __name__ == "__main__":
+    # e.g.: python scanner.py SOUN AAPL MSFT --move 0.15 --top 20 --output return/scan.csv
+    parser = argparse.ArgumentParser(description="Rank the option contracts of many tickers by % profit at a target move.")
+    parser.add_argument("tickers", nargs="+", help="Stock ticker symbols")
+    parser.add_argument("--move", type=float, default=0.15, help="Relative move at expiration, e.g. 0.15 for +15%%")
+    parser.add_argument("--top", type=positive_int, default=20, help="Number of contracts to keep")
+    parser.add_argument("--commission", type=float, default=0.0, help="Commission per contract")
+    parser.add_argument("--workers", type=int, default=8, help="Tickers fetched at the same time")
+    parser.add_argument("--output", default=None, help="Optional CSV output")
+    args = parser.parse_args()
+
+    pd.set_option('display.max_columns', None)
+    pd.set_option('display.width', 1000)
+    results = scan_options([ticker.upper() for ticker in args.tickers], args.move, args.top, args.commission,
+                           max_workers=args.workers)
+    print(results)
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        results.to_csv(args.output, index=False)
+        print(f"\nResults saved to {args.output}")
@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+
+
+def find_runs(changes, threshold=0.0, below=True):
+    """
+    Finds every maximal run of consecutive days beyond a threshold, for all tickers at once.
+
+    A day counts when its change is strictly below (or above) the threshold; NaN breaks a run.
+
+    Args:
+        changes (pd.Series or pd.DataFrame): Daily % changes indexed by date, one column per ticker.
+        threshold (float): The % change a day has to beat (e.g., 0 or -1).
+        below (bool): Count days below the threshold (drops) instead of above it (rises).
+
+    Returns:
+        pd.DataFrame: One row per run with ticker, start, end and length (in trading days).
+    """
+    if isinstance(changes, pd.Series):
+        changes = changes.to_frame(changes.name if changes.name is not None else "value")
+    values = changes.to_numpy(dtype=float)
+    hits = values < threshold if below else values > threshold
+
+    # Pad each column with False so every run has a rising and a falling edge
+    padded = np.zeros((hits.shape[0] + 2, hits.shape[1]), dtype=np.int8)
+    padded[1:-1] = hits
+    edges = np.diff(padded, axis=0).T  # (tickers, days + 1), ordered by ticker then day
+
+    ticker_pos, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)  # exclusive end positions, paired with starts
+
+    return pd.DataFrame({
+        "ticker": changes.columns[ticker_pos],
+        "start": changes.index[starts],
+        "end": changes.index[ends - 1],
+        "length": ends - starts,
+    })
+
+
+def count_streaks(changes, lengths, threshold=0.0, below=True):
+    """
+    Counts streaks of N consecutive days beyond a threshold for many tickers and N values at once.
+
+    A run of L days holds L - N + 1 overlapping streaks of N days (every window is counted, like a
+    sliding counter) and L // N non-overlapping ones.
+
+    Args:
+        changes (pd.Series or pd.DataFrame): Daily % changes indexed by date, one column per ticker.
+        lengths (list): Streak lengths N to count (e.g., [3, 4, 5]).
+        threshold (float): The % change a day has to beat (e.g., 0 or -1).
+        below (bool): Count days below the threshold (drops) instead of above it (rises).
+
+    Returns:
+        tuple: (pd.DataFrame of counts indexed by ticker with (overlapping/non_overlapping, N) columns,
+                pd.DataFrame of the runs long enough for the shortest N, with their start/end dates)
+    """
+    runs = find_runs(changes, threshold=threshold, below=below)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    tickers = changes.columns if isinstance(changes, pd.DataFrame) else pd.Index(
+        [changes.name if changes.name is not None else "value"])
+
+    # (runs x lengths) streak counts, summed per ticker
+    run_lengths = runs["length"].to_numpy()[:, None]
+    overlapping = np.clip(run_lengths - lengths + 1, 0, None)
+    non_overlapping = run_lengths // lengths
+    ticker_codes = tickers.get_indexer(runs["ticker"])
+
+    counts = {}
+    for name, per_run in (("overlapping", overlapping), ("non_overlapping", non_overlapping)):
+        for column, n in enumerate(lengths):
+            counts[(name, int(n))] = np.bincount(ticker_codes, weights=per_run[:, column],
+                                                 minlength=len(tickers)).astype(np.int64)
+    counts = pd.DataFrame(counts, index=tickers)
+    counts.index.name = "ticker"
+
+    return counts, runs[runs["length"] >= lengths.min()].reset_index(drop=True)
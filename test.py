@@ -1,12 +1,13 @@
 import yfinance as yf
 import pandas as pd
 from pytz import timezone
+from bar_cache import cached_download
 
 # Define the stock symbol
 symbol = "SOUNW"
 
 # Fetch data for the stock, including extended hours
-data = yf.download(symbol, period="1d", interval="1m", prepost=True)
+data = cached_download(symbol, period="1d", interval="1m", prepost=True)
 
 # Convert the index (timestamps) from UTC to EST
 data.index = data.index.tz_convert("US/Eastern")
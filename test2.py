@@ -13,8 +13,15 @@ from datetime import datetime
 from yahooquery import Ticker
 from PyQt5.QtCore import QDate
 from datetime import datetime
+from earnings_store import EarningsStore
+
+def fetch_earnings_yahooquery(symbol, store=None):
+    store = store or EarningsStore()
+    cached, _ = store.lookup([symbol])
+    if symbol in cached:
+        date_obj = cached[symbol]
+        return QDate(date_obj.year, date_obj.month, date_obj.day) if date_obj else None
 
-def fetch_earnings_yahooquery(symbol):
     try:
         ticker = Ticker(symbol)
         events = ticker.calendar_events
@@ -25,7 +32,9 @@ def fetch_earnings_yahooquery(symbol):
             # Extract only the date part before space
             date_str = earnings_date_list[0].split()[0]  # '2025-07-23'
             date_obj = datetime.strptime(date_str, "%Y-%m-%d")
+            store.save({symbol: date_obj})
             return QDate(date_obj.year, date_obj.month, date_obj.day)
+        store.save({symbol: None})
 
     except Exception as e:
         print(f"Error for {symbol}: {e}")
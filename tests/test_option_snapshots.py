@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from option_snapshots import load_snapshots, save_snapshot
+
+
+def make_chain(volume, open_interest):
+    index = pd.MultiIndex.from_tuples(
+        [("SOUN", pd.Timestamp("2025-07-18"), "calls"), ("SOUN", pd.Timestamp("2025-07-18"), "puts")],
+        names=["symbol", "expiration", "optionType"],
+    )
+    return pd.DataFrame({
+        "contractSymbol": ["SOUN250718C00010000", "SOUN250718P00010000"],
+        "strike": [10.0, 10.0],
+        "bid": [1.0, 0.5],
+        "ask": [1.2, 0.6],
+        "volume": volume,
+        "openInterest": open_interest,
+        "inTheMoney": [True, False],
+    }, index=index)
+
+
+def test_mixed_integer_and_nan_snapshots_load_together(tmp_path):
+    save_snapshot("SOUN", make_chain([5, 7], [100, 200]), pd.Timestamp("2025-07-01 15:00"), root=str(tmp_path))
+    save_snapshot("SOUN", make_chain([np.nan, 3.5], [np.nan, 150]), pd.Timestamp("2025-07-02 15:00"), root=str(tmp_path))
+
+    snapshots = load_snapshots("SOUN", root=str(tmp_path))
+
+    assert len(snapshots) == 4
+    assert snapshots["volume"].dtype == np.float64
+    assert snapshots["volume"].isna().sum() == 1
+    assert sorted(snapshots["openInterest"].dropna()) == [100, 150, 200]
+
+
+def test_integer_files_from_older_stores_are_promoted(tmp_path):
+    save_snapshot("SOUN", make_chain([np.nan, 3.5], [np.nan, 150]), pd.Timestamp("2025-07-02 15:00"), root=str(tmp_path))
+    # A file written with integer quote columns, sorting before the float one
+    older = tmp_path / "ticker=SOUN" / "expiry=2025-07-18" / "20250701T150000.parquet"
+    table = pa.table({
+        "Type": ["Call"], "contractSymbol": ["SOUN250718C00010000"], "strike": [10.0], "bid": [1.0], "ask": [1.2],
+        "volume": pa.array([5], pa.int64()), "openInterest": pa.array([100], pa.int64()), "inTheMoney": [True],
+        "snapshot": [pd.Timestamp("2025-07-01 15:00")],
+    })
+    pq.write_table(table, older)
+
+    snapshots = load_snapshots("SOUN", strike_range=(5, 15), root=str(tmp_path))
+
+    assert len(snapshots) == 3
+    assert snapshots["volume"].dtype == np.float64